@@ -1,6 +1,8 @@
 import html
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
+import torch
 from loguru import logger
 from tqdm import tqdm
 from collections import defaultdict
@@ -22,6 +24,19 @@ TABLE_ORI_CLS_BATCH_SIZE = 16
 TABLE_Wired_Wireless_CLS_BATCH_SIZE = 16
 
 
+# 每个模型复用一个CUDA stream, 避免每个批次都新建stream
+_model_cuda_streams = {}
+
+
+def run_in_cuda_stream(model, func, *args):
+    """在model所在设备上属于该模型的CUDA stream中执行func, 使不同线程中的模型推理可以在GPU上并发."""
+    stream = _model_cuda_streams.get(model)
+    if stream is None:
+        stream = _model_cuda_streams.setdefault(model, torch.cuda.Stream(device=model.device))
+    with torch.cuda.stream(stream):
+        return func(*args)
+
+
 class BatchAnalyze:
     def __init__(self, model_manager, batch_ratio: int, formula_enable, table_enable, enable_ocr_det_batch: bool = True):
         self.batch_ratio = batch_ratio
@@ -47,18 +62,37 @@ class BatchAnalyze:
 
         np_images = [np.asarray(image) for image, _, _ in images_with_extra_info]
 
-        # doclayout_yolo
+        layout_model = self.model.layout_model
+        if self.formula_enable and all(
+            str(model.device).startswith('cuda') for model in (layout_model, self.model.mfd_model)
+        ):
+            # 布局检测与公式检测互不依赖, 两个模型都在GPU上时各自在独立的CUDA stream上并发执行,
+            # 使一个模型的前后处理与另一个模型的GPU计算相互重叠
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                mfd_model = self.model.mfd_model
+                layout_future = executor.submit(
+                    run_in_cuda_stream, layout_model,
+                    layout_model.batch_predict, pil_images, YOLO_LAYOUT_BASE_BATCH_SIZE
+                )
+                mfd_future = executor.submit(
+                    run_in_cuda_stream, mfd_model,
+                    mfd_model.batch_predict, np_images, MFD_BASE_BATCH_SIZE
+                )
+                images_layout_res += layout_future.result()
+                images_mfd_res = mfd_future.result()
+        else:
+            # doclayout_yolo
+            images_layout_res += layout_model.batch_predict(
+                pil_images, YOLO_LAYOUT_BASE_BATCH_SIZE
+            )
 
-        images_layout_res += self.model.layout_model.batch_predict(
-            pil_images, YOLO_LAYOUT_BASE_BATCH_SIZE
-        )
+            if self.formula_enable:
+                # 公式检测
+                images_mfd_res = self.model.mfd_model.batch_predict(
+                    np_images, MFD_BASE_BATCH_SIZE
+                )
 
         if self.formula_enable:
-            # 公式检测
-            images_mfd_res = self.model.mfd_model.batch_predict(
-                np_images, MFD_BASE_BATCH_SIZE
-            )
-
             # 公式识别
             images_formula_list = self.model.mfr_model.batch_predict(
                 images_mfd_res,
@@ -301,7 +335,7 @@ class BatchAnalyze:
                         img = crop_info[0]
                         h, w = img.shape[:2]
                         # 创建目标尺寸的白色背景
-                        padded_img = np.ones((target_h, target_w, 3), dtype=np.uint8) * 255
+                        padded_img = np.full((target_h, target_w, 3), 255, dtype=np.uint8)
                         padded_img[:h, :w] = img
                         batch_images.append(padded_img)
 
@@ -14,6 +14,7 @@ from ...model.table.cls.paddle_table_cls import PaddleTableClsModel
 # from ...model.table.rec.RapidTable import RapidTableModel
 from ...model.table.rec.slanet_plus.main import RapidTableModel
 from ...model.table.rec.unet_table.main import UnetTableModel
+from ...utils.config_reader import get_layout_device
 from ...utils.enum_class import ModelPath
 from ...utils.models_download_utils import auto_download_and_get_model_root_path
 
@@ -241,7 +242,7 @@ class MineruPipelineModel:
             doclayout_yolo_weights=str(
                 os.path.join(auto_download_and_get_model_root_path(ModelPath.doclayout_yolo), ModelPath.doclayout_yolo)
             ),
-            device=self.device,
+            device=get_layout_device(self.device),
         )
         # 初始化ocr
         self.ocr_model = atom_model_manager.get_atom_model(
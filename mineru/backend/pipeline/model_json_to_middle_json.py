@@ -28,8 +28,6 @@ from mineru.utils.hash_utils import bytes_md5
 def page_model_info_to_page_info(page_model_info, image_dict, page, image_writer, page_index, ocr_enable=False, formula_enabled=True):
     scale = image_dict["scale"]
     page_pil_img = image_dict["img_pil"]
-    # page_img_md5 = str_md5(image_dict["img_base64"])
-    page_img_md5 = bytes_md5(page_pil_img.tobytes())
     page_w, page_h = map(int, page.get_size())
     magic_model = MagicModel(page_model_info, scale)
 
@@ -152,8 +150,11 @@ def page_model_info_to_page_info(page_model_info, image_dict, page, image_writer
         return None
 
     """对image/table/interline_equation截图"""
+    page_img_md5 = None  # 整页md5较耗时, 遇到第一个需要截图的span时再计算
     for span in spans:
         if span['type'] in [ContentType.IMAGE, ContentType.TABLE, ContentType.INTERLINE_EQUATION]:
+            if page_img_md5 is None:
+                page_img_md5 = bytes_md5(page_pil_img.tobytes())
             span = cut_image_and_table(
                 span, page_pil_img, page_img_md5, page_index, image_writer, scale=scale
             )
@@ -1,23 +1,29 @@
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 from PIL import Image
 from loguru import logger
 
 from .model_init import MineruPipelineModel
 from mineru.utils.config_reader import get_device
+from ...utils.check_sys_env import is_windows_environment
 from ...utils.enum_class import ImageType
 from ...utils.pdf_classify import classify
 from ...utils.pdf_image_tools import load_images_from_pdf
 from ...utils.model_utils import get_vram, clean_memory
+from ...utils.os_env_config import get_cudnn_benchmark_enable, get_cuda_alloc_conf
 
 
 os.environ['PYTORCH_ENABLE_MPS_FALLBACK'] = '1'  # 让mps可以fallback
 os.environ['NO_ALBUMENTATIONS_UPDATE'] = '1'  # 禁止albumentations检查更新
 
+
 class ModelSingleton:
     _instance = None
     _models = {}
+    _lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -31,13 +37,19 @@ class ModelSingleton:
         table_enable=None,
     ):
         key = (lang, formula_enable, table_enable)
-        if key not in self._models:
-            self._models[key] = custom_model_init(
-                lang=lang,
-                formula_enable=formula_enable,
-                table_enable=table_enable,
-            )
-        return self._models[key]
+        # 模型已加载时无需加锁直接返回, 仅在首次加载时加锁并再次检查, 避免并发重复初始化
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = custom_model_init(
+                        lang=lang,
+                        formula_enable=formula_enable,
+                        table_enable=table_enable,
+                    )
+                    self._models[key] = model
+        return model
 
 
 def custom_model_init(
@@ -49,6 +61,15 @@ def custom_model_init(
     # 从配置文件读取model-dir和device
     device = get_device()
 
+    if str(device).startswith('cuda'):
+        # CUDA缓存分配器在首次分配显存时读取该配置, 必须在下方加载模型到GPU之前设置
+        os.environ['PYTORCH_CUDA_ALLOC_CONF'] = get_cuda_alloc_conf()
+
+    if str(device).startswith('cuda') and get_cudnn_benchmark_enable():
+        # 布局/公式检测输入尺寸固定时, 让cuDNN为其选择最快的卷积实现
+        import torch
+        torch.backends.cudnn.benchmark = True
+
     formula_config = {"enable": formula_enable}
     table_config = {"enable": table_enable}
 
@@ -67,6 +88,26 @@ def custom_model_init(
     return custom_model
 
 
+def _get_ocr_enable(pdf_bytes, parse_method):
+    # 确定OCR设置
+    _ocr_enable = False
+    if parse_method == 'auto':
+        if classify(pdf_bytes) == 'ocr':
+            _ocr_enable = True
+    elif parse_method == 'ocr':
+        _ocr_enable = True
+    return _ocr_enable
+
+
+def _load_images(pdf_bytes):
+    # 收集每个数据集中的页面
+    # load_images_start = time.time()
+    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
+    # load_images_time = round(time.time() - load_images_start, 2)
+    # logger.debug(f"load images cost: {load_images_time}, speed: {round(len(images_list) / load_images_time, 3)} images/s")
+    return images_list, pdf_doc
+
+
 def doc_analyze(
         pdf_bytes_list,
         lang_list,
@@ -85,52 +126,56 @@ def doc_analyze(
 
     all_image_lists = []
     all_pdf_docs = []
-    ocr_enabled_list = []
-    for pdf_idx, pdf_bytes in enumerate(pdf_bytes_list):
-        # 确定OCR设置
-        _ocr_enable = False
-        if parse_method == 'auto':
-            if classify(pdf_bytes) == 'ocr':
-                _ocr_enable = True
-        elif parse_method == 'ocr':
-            _ocr_enable = True
 
-        ocr_enabled_list.append(_ocr_enable)
-        _lang = lang_list[pdf_idx]
-
-        # 收集每个数据集中的页面
-        # load_images_start = time.time()
-        images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
-        # load_images_time = round(time.time() - load_images_start, 2)
-        # logger.debug(f"load images cost: {load_images_time}, speed: {round(len(images_list) / load_images_time, 3)} images/s")
-        all_image_lists.append(images_list)
-        all_pdf_docs.append(pdf_doc)
-        for page_idx in range(len(images_list)):
-            img_dict = images_list[page_idx]
-            all_pages_info.append((
-                pdf_idx, page_idx,
-                img_dict['img_pil'], _ocr_enable, _lang,
-            ))
-
-    # 准备批处理
-    images_with_extra_info = [(info[2], info[3], info[4]) for info in all_pages_info]
-    batch_size = min_batch_inference_size
-    batch_images = [
-        images_with_extra_info[i:i + batch_size]
-        for i in range(0, len(images_with_extra_info), batch_size)
-    ]
+    # pdfium不是线程安全的, 分类在后台渲染开始前于当前线程完成
+    ocr_enabled_list = [_get_ocr_enable(pdf_bytes, parse_method) for pdf_bytes in pdf_bytes_list]
 
-    # 执行批处理
+    batch_size = min_batch_inference_size
     results = []
     processed_images_count = 0
-    for index, batch_image in enumerate(batch_images):
+    # 本次调用内发生显存不足后记录的batch_ratio上限, 在后续批次中生效
+    oom_state = {}
+
+    def run_batch(batch_image):
+        nonlocal processed_images_count
         processed_images_count += len(batch_image)
         logger.info(
-            f'Batch {index + 1}/{len(batch_images)}: '
-            f'{processed_images_count} pages/{len(images_with_extra_info)} pages'
+            f'Batch {len(results) // batch_size + 1}: '
+            f'{processed_images_count} pages'
         )
-        batch_results = batch_image_analyze(batch_image, formula_enable, table_enable)
-        results.extend(batch_results)
+        results.extend(batch_image_analyze(batch_image, formula_enable, table_enable, oom_state))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if is_windows_environment():
+            # Windows下在当前进程内用pdfium渲染, 直接在当前线程中依次加载
+            loaded_pdfs = map(_load_images, pdf_bytes_list)
+        else:
+            # 渲染在进程池中进行, 后台线程依次加载PDF, 主线程凑满一个batch即开始推理, 使渲染与推理重叠;
+            # 推理期间主线程不调用pdfium, pdfium仅在后台线程中使用;
+            # 加载不等待推理, 所有页面图片都会保留到返回, 峰值内存与先全部加载再推理时相同
+            loaded_pdfs = executor.map(_load_images, pdf_bytes_list)
+        pending_images = []
+        for pdf_idx, (images_list, pdf_doc) in enumerate(loaded_pdfs):
+            _ocr_enable = ocr_enabled_list[pdf_idx]
+            _lang = lang_list[pdf_idx]
+
+            all_image_lists.append(images_list)
+            all_pdf_docs.append(pdf_doc)
+            for page_idx in range(len(images_list)):
+                img_dict = images_list[page_idx]
+                all_pages_info.append((
+                    pdf_idx, page_idx,
+                    img_dict['img_pil'], _ocr_enable, _lang,
+                ))
+                pending_images.append((img_dict['img_pil'], _ocr_enable, _lang))
+
+            # 按固定batch_size切分, 与全部加载完成后再切分的结果一致
+            while len(pending_images) >= batch_size:
+                run_batch(pending_images[:batch_size])
+                pending_images = pending_images[batch_size:]
+
+        if pending_images:
+            run_batch(pending_images)
 
     # 构建返回结果
     infer_results = []
@@ -153,7 +198,12 @@ def doc_analyze(
 def batch_image_analyze(
         images_with_extra_info: List[Tuple[Image.Image, bool, str]],
         formula_enable=True,
-        table_enable=True):
+        table_enable=True,
+        oom_state=None):
+    """
+    oom_state为可选的dict, 由调用方在多个批次间共享, 显存不足时在其中记录减小后的batch_ratio上限,
+    使同一文档的后续批次不再重复OOM。
+    """
 
     from .batch_analyze import BatchAnalyze
 
@@ -196,8 +246,23 @@ def batch_image_analyze(
     else:
         enable_ocr_det_batch = True
 
-    batch_model = BatchAnalyze(model_manager, batch_ratio, formula_enable, table_enable, enable_ocr_det_batch)
-    results = batch_model(images_with_extra_info)
+    if oom_state is not None and 'batch_ratio_cap' in oom_state:
+        batch_ratio = min(batch_ratio, oom_state['batch_ratio_cap'])
+
+    while True:
+        batch_model = BatchAnalyze(model_manager, batch_ratio, formula_enable, table_enable, enable_ocr_det_batch)
+        try:
+            results = batch_model(images_with_extra_info)
+            break
+        except torch.cuda.OutOfMemoryError:
+            if batch_ratio <= 1:
+                raise
+            # 显存不足时将batch_ratio减半后重试, 并让后续批次沿用减小后的值, 避免反复OOM
+            batch_ratio //= 2
+            if oom_state is not None:
+                oom_state['batch_ratio_cap'] = batch_ratio
+            clean_memory(device)
+            logger.warning(f'CUDA out of memory, retrying with Batch Ratio: {batch_ratio}.')
 
     clean_memory(get_device())
 
@@ -1,4 +1,4 @@
-from mineru.utils.boxbase import bbox_relative_pos, calculate_iou, bbox_distance, get_minbox_if_overlap_by_ratio
+from mineru.utils.boxbase import bbox_relative_pos, calculate_iou_matrix, bbox_distance, get_minbox_if_overlap_by_ratio
 from mineru.utils.enum_class import CategoryId, ContentType
 from mineru.utils.magic_model_utils import tie_up_category_by_distance_v3, reduct_overlap
 
@@ -116,12 +116,15 @@ class MagicModel:
                 ], self.__page_model_info['layout_dets']
             )
         )
+        # 两两之间的iou一次性批量计算
+        layout_bboxes = [layout_det['bbox'] for layout_det in layout_dets]
+        high_iou_matrix = calculate_iou_matrix(layout_bboxes, layout_bboxes) > 0.9
         for i in range(len(layout_dets)):
             for j in range(i + 1, len(layout_dets)):
                 layout_det1 = layout_dets[i]
                 layout_det2 = layout_dets[j]
 
-                if calculate_iou(layout_det1['bbox'], layout_det2['bbox']) > 0.9:
+                if high_iou_matrix[i, j]:
 
                     layout_det_need_remove = layout_det1 if layout_det1['score'] < layout_det2['score'] else layout_det2
 
@@ -6,6 +6,18 @@ from mineru.backend.pipeline.para_split import ListLineTag
 from mineru.utils.enum_class import BlockType, ContentType, MakeMode
 from mineru.utils.language import detect_lang
 
+HYPHEN_AT_LINE_END_PATTERN = re.compile(r'[A-Za-z]+-\s*$')
+
+# 按正文方式拼接的段落类型
+TEXT_LIKE_BLOCK_TYPES = frozenset({BlockType.TEXT, BlockType.LIST, BlockType.INDEX})
+# 中文/日语/韩文语境
+CJK_LANGS = frozenset({'zh', 'ja', 'ko'})
+# 西方文本语境下需要空格分隔的span类型
+SPACE_SEPARATED_SPAN_TYPES = frozenset({ContentType.TEXT, ContentType.INLINE_EQUATION})
+MARKDOWN_MAKE_MODES = frozenset({MakeMode.MM_MD, MakeMode.NLP_MD})
+# NLP_MD 模式下不输出的段落类型
+VISUAL_BLOCK_TYPES = frozenset({BlockType.IMAGE, BlockType.TABLE})
+
 
 def __is_hyphen_at_line_end(line):
     """Check if a line ends with one or more letters followed by a hyphen.
@@ -17,7 +29,21 @@ def __is_hyphen_at_line_end(line):
     bool: True if the line ends with one or more letters followed by a hyphen, False otherwise.
     """
     # Use regex to check if the line ends with one or more letters followed by a hyphen
-    return bool(re.search(r'[A-Za-z]+-\s*$', line))
+    return HYPHEN_AT_LINE_END_PATTERN.search(line) is not None
+
+
+def split_sub_blocks(blocks, body_type, caption_type, footnote_type):
+    """一次遍历将图片/表格的子块按类型分到 body/caption/footnote 三个列表中, 各列表保持原有顺序"""
+    body_blocks, caption_blocks, footnote_blocks = [], [], []
+    for block in blocks:
+        block_type = block['type']
+        if block_type == body_type:
+            body_blocks.append(block)
+        elif block_type == caption_type:
+            caption_blocks.append(block)
+        elif block_type == footnote_type:
+            footnote_blocks.append(block)
+    return body_blocks, caption_blocks, footnote_blocks
 
 
 def make_blocks_to_markdown(paras_of_layout,
@@ -25,74 +51,78 @@ def make_blocks_to_markdown(paras_of_layout,
                                       img_buket_path='',
                                       ):
     page_markdown = []
+    # 图片链接的前缀对整页相同, 只拼接一次
+    img_link_prefix = f"![]({img_buket_path}/"
+    if mode == MakeMode.NLP_MD:
+        # 纯文本模式不输出图片和表格, 在进入段落循环前一次性过滤掉
+        paras_of_layout = [para_block for para_block in paras_of_layout if para_block['type'] not in VISUAL_BLOCK_TYPES]
     for para_block in paras_of_layout:
-        para_text = ''
+        # 段落片段先收集到列表, 最后一次性拼接, 避免嵌套循环中反复拼接字符串
+        para_parts = []
         para_type = para_block['type']
-        if para_type in [BlockType.TEXT, BlockType.LIST, BlockType.INDEX]:
-            para_text = merge_para_with_text(para_block)
+        if para_type in TEXT_LIKE_BLOCK_TYPES:
+            para_parts.append(merge_para_with_text(para_block))
         elif para_type == BlockType.TITLE:
             title_level = get_title_level(para_block)
-            para_text = f'{"#" * title_level} {merge_para_with_text(para_block)}'
+            para_parts.append(f'{"#" * title_level} {merge_para_with_text(para_block)}')
         elif para_type == BlockType.INTERLINE_EQUATION:
             if len(para_block['lines']) == 0 or len(para_block['lines'][0]['spans']) == 0:
                 continue
             if para_block['lines'][0]['spans'][0].get('content', ''):
-                para_text = merge_para_with_text(para_block)
+                para_parts.append(merge_para_with_text(para_block))
             else:
-                para_text += f"![]({img_buket_path}/{para_block['lines'][0]['spans'][0]['image_path']})"
+                para_parts.append(f"{img_link_prefix}{para_block['lines'][0]['spans'][0]['image_path']})")
         elif para_type == BlockType.IMAGE:
-            if mode == MakeMode.NLP_MD:
-                continue
-            elif mode == MakeMode.MM_MD:
-                # 检测是否存在图片脚注
-                has_image_footnote = any(block['type'] == BlockType.IMAGE_FOOTNOTE for block in para_block['blocks'])
+            if mode == MakeMode.MM_MD:
+                image_body_blocks, image_caption_blocks, image_footnote_blocks = split_sub_blocks(
+                    para_block['blocks'], BlockType.IMAGE_BODY, BlockType.IMAGE_CAPTION, BlockType.IMAGE_FOOTNOTE
+                )
                 # 如果存在图片脚注，则将图片脚注拼接到图片正文后面
-                if has_image_footnote:
-                    for block in para_block['blocks']:  # 1st.拼image_caption
-                        if block['type'] == BlockType.IMAGE_CAPTION:
-                            para_text += merge_para_with_text(block) + '  \n'
-                    for block in para_block['blocks']:  # 2nd.拼image_body
-                        if block['type'] == BlockType.IMAGE_BODY:
-                            for line in block['lines']:
-                                for span in line['spans']:
-                                    if span['type'] == ContentType.IMAGE:
-                                        if span.get('image_path', ''):
-                                            para_text += f"![]({img_buket_path}/{span['image_path']})"
-                    for block in para_block['blocks']:  # 3rd.拼image_footnote
-                        if block['type'] == BlockType.IMAGE_FOOTNOTE:
-                            para_text += '  \n' + merge_para_with_text(block)
+                if image_footnote_blocks:
+                    for block in image_caption_blocks:  # 1st.拼image_caption
+                        para_parts.append(merge_para_with_text(block) + '  \n')
+                    for block in image_body_blocks:  # 2nd.拼image_body
+                        for line in block['lines']:
+                            for span in line['spans']:
+                                if span['type'] == ContentType.IMAGE:
+                                    image_path = span.get('image_path')
+                                    if image_path:
+                                        para_parts.append(f"{img_link_prefix}{image_path})")
+                    for block in image_footnote_blocks:  # 3rd.拼image_footnote
+                        para_parts.append('  \n' + merge_para_with_text(block))
                 else:
-                    for block in para_block['blocks']:  # 1st.拼image_body
-                        if block['type'] == BlockType.IMAGE_BODY:
-                            for line in block['lines']:
-                                for span in line['spans']:
-                                    if span['type'] == ContentType.IMAGE:
-                                        if span.get('image_path', ''):
-                                            para_text += f"![]({img_buket_path}/{span['image_path']})"
-                    for block in para_block['blocks']:  # 2nd.拼image_caption
-                        if block['type'] == BlockType.IMAGE_CAPTION:
-                            para_text += '  \n' + merge_para_with_text(block)
-        elif para_type == BlockType.TABLE:
-            if mode == MakeMode.NLP_MD:
-                continue
-            elif mode == MakeMode.MM_MD:
-                for block in para_block['blocks']:  # 1st.拼table_caption
-                    if block['type'] == BlockType.TABLE_CAPTION:
-                        para_text += merge_para_with_text(block) + '  \n'
-                for block in para_block['blocks']:  # 2nd.拼table_body
-                    if block['type'] == BlockType.TABLE_BODY:
+                    for block in image_body_blocks:  # 1st.拼image_body
                         for line in block['lines']:
                             for span in line['spans']:
-                                if span['type'] == ContentType.TABLE:
-                                    # if processed by table model
-                                    if span.get('html', ''):
-                                        para_text += f"\n{span['html']}\n"
-                                    elif span.get('image_path', ''):
-                                        para_text += f"![]({img_buket_path}/{span['image_path']})"
-                for block in para_block['blocks']:  # 3rd.拼table_footnote
-                    if block['type'] == BlockType.TABLE_FOOTNOTE:
-                        para_text += '\n' + merge_para_with_text(block) + '  '
-
+                                if span['type'] == ContentType.IMAGE:
+                                    image_path = span.get('image_path')
+                                    if image_path:
+                                        para_parts.append(f"{img_link_prefix}{image_path})")
+                    for block in image_caption_blocks:  # 2nd.拼image_caption
+                        para_parts.append('  \n' + merge_para_with_text(block))
+        elif para_type == BlockType.TABLE:
+            if mode == MakeMode.MM_MD:
+                table_body_blocks, table_caption_blocks, table_footnote_blocks = split_sub_blocks(
+                    para_block['blocks'], BlockType.TABLE_BODY, BlockType.TABLE_CAPTION, BlockType.TABLE_FOOTNOTE
+                )
+                for block in table_caption_blocks:  # 1st.拼table_caption
+                    para_parts.append(merge_para_with_text(block) + '  \n')
+                for block in table_body_blocks:  # 2nd.拼table_body
+                    for line in block['lines']:
+                        for span in line['spans']:
+                            if span['type'] == ContentType.TABLE:
+                                # if processed by table model
+                                table_html = span.get('html')
+                                if table_html:
+                                    para_parts.append(f"\n{table_html}\n")
+                                else:
+                                    image_path = span.get('image_path')
+                                    if image_path:
+                                        para_parts.append(f"{img_link_prefix}{image_path})")
+                for block in table_footnote_blocks:  # 3rd.拼table_footnote
+                    para_parts.append('\n' + merge_para_with_text(block) + '  ')
+
+        para_text = ''.join(para_parts)
         if para_text.strip() == '':
             continue
         else:
@@ -102,6 +132,13 @@ def make_blocks_to_markdown(paras_of_layout,
     return page_markdown
 
 
+# Full-width letters and numbers (FF21-FF3A for A-Z, FF41-FF5A for a-z, FF10-FF19 for 0-9), shifted to ASCII range
+FULL_TO_HALF_TABLE = {
+    code: code - 0xFEE0
+    for code in [*range(0xFF21, 0xFF3B), *range(0xFF41, 0xFF5B), *range(0xFF10, 0xFF1A)]
+}
+
+
 def full_to_half(text: str) -> str:
     """Convert full-width characters to half-width characters using code point manipulation.
 
@@ -111,15 +148,7 @@ def full_to_half(text: str) -> str:
     Returns:
         String with full-width characters converted to half-width
     """
-    result = []
-    for char in text:
-        code = ord(char)
-        # Full-width letters and numbers (FF21-FF3A for A-Z, FF41-FF5A for a-z, FF10-FF19 for 0-9)
-        if (0xFF21 <= code <= 0xFF3A) or (0xFF41 <= code <= 0xFF5A) or (0xFF10 <= code <= 0xFF19):
-            result.append(chr(code - 0xFEE0))  # Shift to ASCII range
-        else:
-            result.append(char)
-    return ''.join(result)
+    return text.translate(FULL_TO_HALF_TABLE)
 
 latex_delimiters_config = get_latex_delimiter_config()
 
@@ -136,66 +165,75 @@ inline_left_delimiter = delimiters['inline']['left']
 inline_right_delimiter = delimiters['inline']['right']
 
 def merge_para_with_text(para_block):
-    block_text = ''
-    for line in para_block['lines']:
+    # 全角转半角与语言检测文本的收集在同一次遍历中完成, 片段最后一次性拼接
+    lines = para_block['lines']
+    block_text_parts = []
+    for line in lines:
         for span in line['spans']:
-            if span['type'] in [ContentType.TEXT]:
-                span['content'] = full_to_half(span['content'])
-                block_text += span['content']
-    block_lang = detect_lang(block_text)
+            if span['type'] == ContentType.TEXT:
+                span_content = full_to_half(span['content'])
+                span['content'] = span_content
+                block_text_parts.append(span_content)
+    block_text = ''.join(block_text_parts)
+    # 块语言在整个段落内不变, 只判断一次; 纯ASCII文本不可能是中日韩语境, 无需调用语言检测模型
+    if block_text.isascii():
+        is_cjk_block = False
+    else:
+        is_cjk_block = detect_lang(block_text) in CJK_LANGS
 
-    para_text = ''
-    for i, line in enumerate(para_block['lines']):
+    para_parts = []
+    for i, line in enumerate(lines):
 
         if i >= 1 and line.get(ListLineTag.IS_LIST_START_LINE, False):
-            para_text += '  \n'
+            para_parts.append('  \n')
 
-        for j, span in enumerate(line['spans']):
+        spans = line['spans']
+        last_span_idx = len(spans) - 1
+        for j, span in enumerate(spans):
 
             span_type = span['type']
             content = ''
             if span_type == ContentType.TEXT:
                 content = escape_special_markdown_char(span['content'])
             elif span_type == ContentType.INLINE_EQUATION:
-                if span.get('content', ''):
-                    content = f"{inline_left_delimiter}{span['content']}{inline_right_delimiter}"
+                equation = span.get('content')
+                if equation:
+                    content = f"{inline_left_delimiter}{equation}{inline_right_delimiter}"
             elif span_type == ContentType.INTERLINE_EQUATION:
-                if span.get('content', ''):
-                    content = f"\n{display_left_delimiter}\n{span['content']}\n{display_right_delimiter}\n"
+                equation = span.get('content')
+                if equation:
+                    content = f"\n{display_left_delimiter}\n{equation}\n{display_right_delimiter}\n"
 
             content = content.strip()
 
             if content:
-                langs = ['zh', 'ja', 'ko']
                 # logger.info(f'block_lang: {block_lang}, content: {content}')
-                if block_lang in langs: # 中文/日语/韩文语境下，换行不需要空格分隔,但是如果是行内公式结尾，还是要加空格
-                    if j == len(line['spans']) - 1 and span_type not in [ContentType.INLINE_EQUATION]:
-                        para_text += content
+                if is_cjk_block: # 中文/日语/韩文语境下，换行不需要空格分隔,但是如果是行内公式结尾，还是要加空格
+                    if j == last_span_idx and span_type != ContentType.INLINE_EQUATION:
+                        para_parts.append(content)
                     else:
-                        para_text += f'{content} '
+                        para_parts.append(content)
+                        para_parts.append(' ')
                 else:
-                    if span_type in [ContentType.TEXT, ContentType.INLINE_EQUATION]:
+                    if span_type in SPACE_SEPARATED_SPAN_TYPES:
                         # 如果span是line的最后一个且末尾带有-连字符，那么末尾不应该加空格,同时应该把-删除
-                        if j == len(line['spans'])-1 and span_type == ContentType.TEXT and __is_hyphen_at_line_end(content):
-                            para_text += content[:-1]
+                        if j == last_span_idx and span_type == ContentType.TEXT and __is_hyphen_at_line_end(content):
+                            para_parts.append(content[:-1])
                         else:  # 西方文本语境下 content间需要空格分隔
-                            para_text += f'{content} '
+                            para_parts.append(content)
+                            para_parts.append(' ')
                     elif span_type == ContentType.INTERLINE_EQUATION:
-                        para_text += content
+                        para_parts.append(content)
             else:
                 continue
 
-    return para_text
+    return ''.join(para_parts)
 
 
 def make_blocks_to_content_list(para_block, img_buket_path, page_idx, page_size):
     para_type = para_block['type']
     para_content = {}
-    if para_type in [
-        BlockType.TEXT,
-        BlockType.LIST,
-        BlockType.INDEX,
-    ]:
+    if para_type in TEXT_LIKE_BLOCK_TYPES:
         para_content = {
             'type': ContentType.TEXT,
             'text': merge_para_with_text(para_block),
@@ -226,32 +264,37 @@ def make_blocks_to_content_list(para_block, img_buket_path, page_idx, page_size)
     elif para_type == BlockType.IMAGE:
         para_content = {'type': ContentType.IMAGE, 'img_path': '', BlockType.IMAGE_CAPTION: [], BlockType.IMAGE_FOOTNOTE: []}
         for block in para_block['blocks']:
-            if block['type'] == BlockType.IMAGE_BODY:
+            block_type = block['type']
+            if block_type == BlockType.IMAGE_BODY:
                 for line in block['lines']:
                     for span in line['spans']:
                         if span['type'] == ContentType.IMAGE:
-                            if span.get('image_path', ''):
-                                para_content['img_path'] = f"{img_buket_path}/{span['image_path']}"
-            if block['type'] == BlockType.IMAGE_CAPTION:
+                            image_path = span.get('image_path')
+                            if image_path:
+                                para_content['img_path'] = f"{img_buket_path}/{image_path}"
+            elif block_type == BlockType.IMAGE_CAPTION:
                 para_content[BlockType.IMAGE_CAPTION].append(merge_para_with_text(block))
-            if block['type'] == BlockType.IMAGE_FOOTNOTE:
+            elif block_type == BlockType.IMAGE_FOOTNOTE:
                 para_content[BlockType.IMAGE_FOOTNOTE].append(merge_para_with_text(block))
     elif para_type == BlockType.TABLE:
         para_content = {'type': ContentType.TABLE, 'img_path': '', BlockType.TABLE_CAPTION: [], BlockType.TABLE_FOOTNOTE: []}
         for block in para_block['blocks']:
-            if block['type'] == BlockType.TABLE_BODY:
+            block_type = block['type']
+            if block_type == BlockType.TABLE_BODY:
                 for line in block['lines']:
                     for span in line['spans']:
                         if span['type'] == ContentType.TABLE:
-                            if span.get('html', ''):
-                                para_content[BlockType.TABLE_BODY] = f"{span['html']}"
+                            table_html = span.get('html')
+                            if table_html:
+                                para_content[BlockType.TABLE_BODY] = f"{table_html}"
 
-                            if span.get('image_path', ''):
-                                para_content['img_path'] = f"{img_buket_path}/{span['image_path']}"
+                            image_path = span.get('image_path')
+                            if image_path:
+                                para_content['img_path'] = f"{img_buket_path}/{image_path}"
 
-            if block['type'] == BlockType.TABLE_CAPTION:
+            elif block_type == BlockType.TABLE_CAPTION:
                 para_content[BlockType.TABLE_CAPTION].append(merge_para_with_text(block))
-            if block['type'] == BlockType.TABLE_FOOTNOTE:
+            elif block_type == BlockType.TABLE_FOOTNOTE:
                 para_content[BlockType.TABLE_FOOTNOTE].append(merge_para_with_text(block))
 
     page_width, page_height = page_size
@@ -274,29 +317,28 @@ def union_make(pdf_info_dict: list,
                make_mode: str,
                img_buket_path: str = '',
                ):
+    # make_mode 在整个文档内不变, 先按模式分派, 再在各自的循环中处理每一页
     output_content = []
-    for page_info in pdf_info_dict:
-        paras_of_layout = page_info.get('para_blocks')
-        paras_of_discarded = page_info.get('discarded_blocks')
-        page_idx = page_info.get('page_idx')
-        page_size = page_info.get('page_size')
-        if make_mode in [MakeMode.MM_MD, MakeMode.NLP_MD]:
+    if make_mode in MARKDOWN_MAKE_MODES:
+        for page_info in pdf_info_dict:
+            paras_of_layout = page_info.get('para_blocks')
             if not paras_of_layout:
                 continue
             page_markdown = make_blocks_to_markdown(paras_of_layout, make_mode, img_buket_path)
             output_content.extend(page_markdown)
-        elif make_mode == MakeMode.CONTENT_LIST:
-            para_blocks = (paras_of_layout or []) + (paras_of_discarded or [])
-            if not para_blocks:
-                continue
-            for para_block in para_blocks:
-                para_content = make_blocks_to_content_list(para_block, img_buket_path, page_idx, page_size)
-                if para_content:
-                    output_content.append(para_content)
-
-    if make_mode in [MakeMode.MM_MD, MakeMode.NLP_MD]:
         return '\n\n'.join(output_content)
     elif make_mode == MakeMode.CONTENT_LIST:
+        for page_info in pdf_info_dict:
+            page_idx = page_info.get('page_idx')
+            page_size = page_info.get('page_size')
+            # 依次遍历正文块和丢弃块, 不再为每页拼接出新的列表
+            for para_blocks in (page_info.get('para_blocks'), page_info.get('discarded_blocks')):
+                if not para_blocks:
+                    continue
+                for para_block in para_blocks:
+                    para_content = make_blocks_to_content_list(para_block, img_buket_path, page_idx, page_size)
+                    if para_content:
+                        output_content.append(para_content)
         return output_content
     else:
         logger.error(f"Unsupported make mode: {make_mode}")
@@ -11,7 +11,7 @@ from mineru.utils.config_reader import get_table_enable, get_llm_aided_config
 from mineru.utils.cut_image import cut_image_and_table
 from mineru.utils.enum_class import ContentType
 from mineru.utils.hash_utils import bytes_md5
-from mineru.utils.pdf_image_tools import get_crop_img
+from mineru.utils.pdf_image_tools import get_crop_np_img
 from mineru.version import __version__
 
 
@@ -35,7 +35,6 @@ def blocks_to_page_info(page_blocks, image_dict, page, image_writer, page_index)
     scale = image_dict["scale"]
     # page_pil_img = image_dict["img_pil"]
     page_pil_img = image_dict["img_pil"]
-    page_img_md5 = bytes_md5(page_pil_img.tobytes())
     width, height = map(int, page.get_size())
 
     magic_model = MagicModel(page_blocks, width, height)
@@ -57,9 +56,9 @@ def blocks_to_page_info(page_blocks, image_dict, page, image_writer, page_index)
             det_db_box_thresh=0.3,
             lang='ch_lite'
         )
+        page_np_img = np.asarray(page_pil_img)
         for title_block in title_blocks:
-            title_pil_img = get_crop_img(title_block['bbox'], page_pil_img, scale)
-            title_np_img = np.array(title_pil_img)
+            title_np_img = get_crop_np_img(title_block['bbox'], page_np_img, scale)
             # 给title_pil_img添加上下左右各50像素白边padding
             title_np_img = cv2.copyMakeBorder(
                 title_np_img, 50, 50, 50, 50, cv2.BORDER_CONSTANT, value=[255, 255, 255]
@@ -76,8 +75,11 @@ def blocks_to_page_info(page_blocks, image_dict, page, image_writer, page_index)
 
     all_spans = magic_model.get_all_spans()
     # 对image/table/interline_equation的span截图
+    page_img_md5 = None  # 延迟到首个截图span时计算
     for span in all_spans:
         if span["type"] in [ContentType.IMAGE, ContentType.TABLE, ContentType.INTERLINE_EQUATION]:
+            if page_img_md5 is None:
+                page_img_md5 = bytes_md5(page_pil_img.tobytes())
             span = cut_image_and_table(span, page_pil_img, page_img_md5, page_index, image_writer, scale=scale)
 
     page_blocks = []
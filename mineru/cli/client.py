@@ -1,6 +1,7 @@
 # Copyright (c) Opendatalab. All rights reserved.
 import os
 import click
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from loguru import logger
 
@@ -187,12 +188,13 @@ def main(
             file_name_list = []
             pdf_bytes_list = []
             lang_list = []
-            for path in path_list:
-                file_name = str(Path(path).stem)
-                pdf_bytes = read_fn(path)
-                file_name_list.append(file_name)
-                pdf_bytes_list.append(pdf_bytes)
-                lang_list.append(lang)
+            # 文件读取与类型识别以IO为主, 多个文件时使用线程池并发读取, map保证结果顺序与输入一致
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1, max(1, len(path_list)))) as executor:
+                for path, pdf_bytes in zip(path_list, executor.map(read_fn, path_list)):
+                    file_name = str(Path(path).stem)
+                    file_name_list.append(file_name)
+                    pdf_bytes_list.append(pdf_bytes)
+                    lang_list.append(lang)
             do_parse(
                 output_dir=output_dir,
                 pdf_file_names=file_name_list,
@@ -212,9 +214,16 @@ def main(
 
     if os.path.isdir(input_path):
         doc_path_list = []
-        for doc_path in Path(input_path).glob('*'):
-            if guess_suffix_by_path(doc_path) in pdf_suffixes + image_suffixes:
-                doc_path_list.append(doc_path)
+        doc_suffixes = set(pdf_suffixes + image_suffixes)
+        # os.scandir 返回的 DirEntry 自带文件类型信息, is_file() 无需额外 stat
+        with os.scandir(input_path) as entries:
+            for entry in entries:
+                # 先排除子目录等非文件项, 避免对其执行magika类型识别
+                if not entry.is_file():
+                    continue
+                doc_path = Path(entry.path)
+                if guess_suffix_by_path(doc_path) in doc_suffixes:
+                    doc_path_list.append(doc_path)
         parse_doc(doc_path_list)
     else:
         parse_doc([Path(input_path)])
@@ -1,21 +1,26 @@
 # Copyright (c) Opendatalab. All rights reserved.
 
-import base64
+import mmap
 import os
 import re
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import click
-import gradio as gr
-from gradio_pdf import PDF
 from loguru import logger
 
+try:
+    # pybase64 提供 SIMD 加速的 base64 编码，未安装时回退到标准库
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+from mineru.backend.vlm.vlm_analyze import ModelSingleton
 from mineru.cli.common import prepare_env, read_fn, aio_do_parse, pdf_suffixes, image_suffixes
 from mineru.utils.check_sys_env import is_mac_os_version_supported
 from mineru.utils.cli_parser import arg_parse
-from mineru.utils.hash_utils import str_sha256
 
 
 async def parse_pdf(doc_path, output_dir, end_page_id, is_ocr, formula_enable, table_enable, language, backend, url):
@@ -51,14 +56,19 @@ async def parse_pdf(doc_path, output_dir, end_page_id, is_ocr, formula_enable, t
         return None
 
 
-def compress_directory_to_zip(directory_path, output_zip_path):
+# 已经是压缩格式的文件, 再次deflate几乎没有收益
+precompressed_suffixes = ('.jpg', '.jpeg', '.png')
+
+
+def compress_directory_to_zip(directory_path, output_zip_path, compress_level=5):
     """压缩指定目录到一个 ZIP 文件。
 
     :param directory_path: 要压缩的目录路径
     :param output_zip_path: 输出的 ZIP 文件路径
+    :param compress_level: deflate 压缩等级, 默认 5, 在速度与压缩率之间取折中
     """
     try:
-        with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compress_level) as zipf:
 
             # 遍历目录中的所有文件和子目录
             for root, dirs, files in os.walk(directory_path):
@@ -67,43 +77,70 @@ def compress_directory_to_zip(directory_path, output_zip_path):
                     file_path = os.path.join(root, file)
                     # 计算相对路径
                     arcname = os.path.relpath(file_path, directory_path)
-                    # 添加文件到 ZIP 文件
-                    zipf.write(file_path, arcname)
+                    # 添加文件到 ZIP 文件, 图片直接存储不再压缩
+                    if file.lower().endswith(precompressed_suffixes):
+                        zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                    else:
+                        zipf.write(file_path, arcname)
         return 0
     except Exception as e:
         logger.exception(e)
         return -1
 
 
+# 匹配Markdown中的图片标签
+image_link_pattern = re.compile(r'\!\[(?:[^\]]*)\]\(([^)]+)\)')
+
+
 def image_to_base64(image_path):
     with open(image_path, 'rb') as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
+        # 空文件无法mmap
+        if os.fstat(image_file.fileno()).st_size == 0:
+            return ''
+        # 通过mmap直接对文件映射内存编码, 省去read()产生的一份完整字节拷贝
+        with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_map:
+            return base64.b64encode(image_map).decode('ascii')
+
+
+def _image_path_to_data_uri(image_dir_path, relative_path):
+    # 只处理以.jpg结尾的图片, 其他格式返回None
+    if not relative_path.endswith('.jpg'):
+        return None
+    full_path = os.path.join(image_dir_path, relative_path)
+    base64_image = image_to_base64(full_path)
+    return f'data:image/jpeg;base64,{base64_image}'
 
 
 def replace_image_with_base64(markdown_text, image_dir_path):
-    # 匹配Markdown中的图片标签
-    pattern = r'\!\[(?:[^\]]*)\]\(([^)]+)\)'
+    # 先收集去重后的图片路径, 每张图片只编码一次, 读文件以IO为主, 使用线程池并发处理
+    relative_paths = list(dict.fromkeys(image_link_pattern.findall(markdown_text)))
+    if not relative_paths:
+        return markdown_text
+    with ThreadPoolExecutor(max_workers=min(8, len(relative_paths))) as executor:
+        data_uris = dict(zip(
+            relative_paths,
+            executor.map(lambda relative_path: _image_path_to_data_uri(image_dir_path, relative_path), relative_paths)
+        ))
 
     # 替换图片链接
     def replace(match):
         relative_path = match.group(1)
-        # 只处理以.jpg结尾的图片
-        if relative_path.endswith('.jpg'):
-            full_path = os.path.join(image_dir_path, relative_path)
-            base64_image = image_to_base64(full_path)
-            return f'![{relative_path}](data:image/jpeg;base64,{base64_image})'
+        data_uri = data_uris[relative_path]
+        if data_uri is not None:
+            return f'![{relative_path}]({data_uri})'
         else:
             # 其他格式的图片保持原样
             return match.group(0)
     # 应用替换
-    return re.sub(pattern, replace, markdown_text)
+    return image_link_pattern.sub(replace, markdown_text)
 
 
 async def to_markdown(file_path, end_pages=10, is_ocr=False, formula_enable=True, table_enable=True, language="ch", backend="pipeline", url=None):
     file_path = to_pdf(file_path)
     # 获取识别的md文件以及压缩包文件路径
     local_md_dir, file_name = await parse_pdf(file_path, './output', end_pages - 1, is_ocr, formula_enable, table_enable, language, backend, url)
-    archive_zip_path = os.path.join('./output', str_sha256(local_md_dir) + '.zip')
+    # file_name 已包含时间戳, 与 local_md_dir 一一对应, 直接用作压缩包名
+    archive_zip_path = os.path.join('./output', file_name + '.zip')
     zip_archive_success = compress_directory_to_zip(local_md_dir, archive_zip_path)
     if zip_archive_success == 0:
         logger.info('Compression successful')
@@ -274,6 +311,8 @@ def to_pdf(file_path):
 
 # 更新界面函数
 def update_interface(backend_choice):
+    import gradio as gr
+
     if backend_choice in ["vlm-transformers", "vlm-vllm-async-engine", "vlm-lmdeploy-engine", "vlm-mlx-engine"]:
         return gr.update(visible=False), gr.update(visible=False)
     elif backend_choice in ["vlm-http-client"]:
@@ -349,6 +388,10 @@ def main(ctx,
         server_name, server_port, latex_delimiters_type, **kwargs
 ):
 
+    # gradio 及其依赖导入较慢, 仅在启动界面时导入, 使本模块可以被快速导入复用
+    import gradio as gr
+    from gradio_pdf import PDF
+
     kwargs.update(arg_parse(ctx))
 
     if latex_delimiters_type == 'a':
@@ -363,7 +406,6 @@ def main(ctx,
     if vllm_engine_enable:
         try:
             print("Start init vLLM engine...")
-            from mineru.backend.vlm.vlm_analyze import ModelSingleton
             model_singleton = ModelSingleton()
             predictor = model_singleton.get_model(
                 "vllm-async-engine",
@@ -377,7 +419,6 @@ def main(ctx,
     elif lmdeploy_engine_enable:
         try:
             print("Start init LMDeploy engine...")
-            from mineru.backend.vlm.vlm_analyze import ModelSingleton
             model_singleton = ModelSingleton()
             predictor = model_singleton.get_model(
                 "lmdeploy-engine",
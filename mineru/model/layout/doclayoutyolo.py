@@ -7,6 +7,7 @@ import numpy as np
 from PIL import Image, ImageDraw
 
 from mineru.utils.enum_class import ModelPath
+from mineru.utils.model_utils import boxes_to_lists, split_batches_by_image_size
 from mineru.utils.models_download_utils import auto_download_and_get_model_root_path
 
 
@@ -21,6 +22,8 @@ class DocLayoutYOLOModel:
     ):
         self.model = YOLOv10(weight).to(device)
         self.device = device
+        # FP16仅在CUDA上有收益, CPU等设备上保持FP32
+        self.half = str(device).startswith('cuda')
         self.imgsz = imgsz
         self.conf = conf
         self.iou = iou
@@ -32,17 +35,11 @@ class DocLayoutYOLOModel:
         if not hasattr(prediction, "boxes") or prediction.boxes is None:
             return layout_res
 
-        for xyxy, conf, cls in zip(
-            prediction.boxes.xyxy.cpu(),
-            prediction.boxes.conf.cpu(),
-            prediction.boxes.cls.cpu(),
-        ):
-            coords = list(map(int, xyxy.tolist()))
-            xmin, ymin, xmax, ymax = coords
+        for (xmin, ymin, xmax, ymax), conf, cls in zip(*boxes_to_lists(prediction.boxes)):
             layout_res.append({
-                "category_id": int(cls.item()),
+                "category_id": cls,
                 "poly": [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
-                "score": round(float(conf.item()), 3),
+                "score": round(conf, 3),
             })
         return layout_res
 
@@ -52,6 +49,7 @@ class DocLayoutYOLOModel:
             imgsz=self.imgsz,
             conf=self.conf,
             iou=self.iou,
+            half=self.half,
             verbose=False
         )[0]
         return self._parse_prediction(prediction)
@@ -61,10 +59,10 @@ class DocLayoutYOLOModel:
         images: List[Union[np.ndarray, Image.Image]],
         batch_size: int = 4
     ) -> List[List[Dict]]:
-        results = []
+        results = [None] * len(images)
         with tqdm(total=len(images), desc="Layout Predict") as pbar:
-            for idx in range(0, len(images), batch_size):
-                batch = images[idx: idx + batch_size]
+            for batch_indices in split_batches_by_image_size(images, batch_size):
+                batch = [images[index] for index in batch_indices]
                 if batch_size == 1:
                     conf = 0.9 * self.conf
                 else:
@@ -74,10 +72,11 @@ class DocLayoutYOLOModel:
                     imgsz=self.imgsz,
                     conf=conf,
                     iou=self.iou,
+                    half=self.half,
                     verbose=False,
                 )
-                for pred in predictions:
-                    results.append(self._parse_prediction(pred))
+                for index, pred in zip(batch_indices, predictions):
+                    results[index] = self._parse_prediction(pred)
                 pbar.update(len(batch))
         return results
 
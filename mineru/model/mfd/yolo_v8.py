@@ -6,6 +6,7 @@ import numpy as np
 from PIL import Image, ImageDraw
 
 from mineru.utils.enum_class import ModelPath
+from mineru.utils.model_utils import split_batches_by_image_size
 from mineru.utils.models_download_utils import auto_download_and_get_model_root_path
 
 
@@ -20,6 +21,9 @@ class YOLOv8MFDModel:
     ):
         self.model = YOLO(weight).to(device)
         self.device = device
+        # FP16仅在CUDA上有收益, CPU等设备上保持FP32
+        self.half = str(device).startswith('cuda')
+        self.on_cpu = str(device) == 'cpu'
         self.imgsz = imgsz
         self.conf = conf
         self.iou = iou
@@ -34,9 +38,13 @@ class YOLOv8MFDModel:
             imgsz=self.imgsz,
             conf=self.conf,
             iou=self.iou,
+            half=self.half,
             verbose=False,
             device=self.device
         )
+        if self.on_cpu:
+            # 结果已在CPU上, 无需再逐个复制一份Results对象
+            return preds if is_batch else preds[0]
         return [pred.cpu() for pred in preds] if is_batch else preds[0].cpu()
 
     def predict(self, image: Union[np.ndarray, Image.Image]):
@@ -47,12 +55,13 @@ class YOLOv8MFDModel:
         images: List[Union[np.ndarray, Image.Image]],
         batch_size: int = 4
     ) -> List:
-        results = []
+        results = [None] * len(images)
         with tqdm(total=len(images), desc="MFD Predict") as pbar:
-            for idx in range(0, len(images), batch_size):
-                batch = images[idx: idx + batch_size]
+            for batch_indices in split_batches_by_image_size(images, batch_size):
+                batch = [images[index] for index in batch_indices]
                 batch_preds = self._run_predict(batch, is_batch=True)
-                results.extend(batch_preds)
+                for index, pred in zip(batch_indices, batch_preds):
+                    results[index] = pred
                 pbar.update(len(batch))
         return results
 
@@ -7,6 +7,7 @@ from loguru import logger
 from tqdm import tqdm
 from mineru.model.utils.tools.infer import pytorchocr_utility
 from mineru.model.utils.pytorchocr.base_ocr_v20 import BaseOCRV20
+from mineru.utils.model_utils import boxes_to_lists
 from .processors import (
     UniMERNetImgDecode,
     UniMERNetTestTransform,
@@ -75,15 +76,15 @@ class FormulaRecognizer(BaseOCRV20):
         inp = torch.from_numpy(inp[0])
         inp = inp.to(self.device)
         rec_formula = []
-        with torch.no_grad():
+        with torch.inference_mode():
             with tqdm(total=len(inp), desc="MFR Predict") as pbar:
                 for index in range(0, len(inp), batch_size):
                     batch_data = inp[index: index + batch_size]
                     # with torch.amp.autocast(device_type=self.device.type):
                     #     batch_preds = [self.net(batch_data)]
                     batch_preds = [self.net(batch_data)]
-                    batch_preds = [p.reshape([-1]) for p in batch_preds[0]]
-                    batch_preds = [bp.cpu().numpy() for bp in batch_preds]
+                    # 整批一次性拷贝到CPU, 避免逐条调用.cpu()引起多次设备同步
+                    batch_preds = [p.reshape([-1]) for p in batch_preds[0].cpu().numpy()]
                     rec_formula += self.post_op(batch_preds)
                     pbar.update(len(batch_preds))
         return rec_formula
@@ -102,14 +103,11 @@ class FormulaRecognizer(BaseOCRV20):
             image = images[image_index]
             formula_list = []
 
-            for idx, (xyxy, conf, cla) in enumerate(
-                zip(mfd_res.boxes.xyxy, mfd_res.boxes.conf, mfd_res.boxes.cls)
-            ):
-                xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]
+            for (xmin, ymin, xmax, ymax), conf, cla in zip(*boxes_to_lists(mfd_res.boxes)):
                 new_item = {
-                    "category_id": 13 + int(cla.item()),
+                    "category_id": 13 + cla,
                     "poly": [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
-                    "score": round(float(conf.item()), 2),
+                    "score": round(conf, 2),
                     "latex": "",
                 }
                 formula_list.append(new_item)
@@ -3,6 +3,7 @@ import numpy as np
 import cv2
 import math
 import re
+from collections import deque
 
 from PIL import Image, ImageOps
 from typing import List, Optional, Tuple, Union, Dict, Any
@@ -14,6 +15,15 @@ from tokenizers import Tokenizer as TokenizerFast
 from mineru.model.mfr.utils import fix_latex_left_right, fix_latex_environments, remove_up_commands, \
     remove_unsupported_commands
 
+# UniMERNetDecode.normalize使用的正则, 预编译避免每条公式重复拼接与查找缓存
+NORMALIZE_TEXT_PATTERN = re.compile(r"(\\(operatorname|mathrm|text|mathbf)\s?\*? {.*?})")
+NORMALIZE_COMMAND_PATTERN = re.compile(r"(\\[a-zA-Z]+)\s(?=\w)|\\[a-zA-Z]+\s(?=})")
+_LETTER = "[a-zA-Z]"
+_NOLETTER = r"[\W_^\d]"
+NOLETTER_NOLETTER_SPACE_PATTERN = re.compile(r"(?!\\ )(%s)\s+?(%s)" % (_NOLETTER, _NOLETTER))
+NOLETTER_LETTER_SPACE_PATTERN = re.compile(r"(?!\\ )(%s)\s+?(%s)" % (_NOLETTER, _LETTER))
+LETTER_NOLETTER_SPACE_PATTERN = re.compile(r"(%s)\s+?(%s)" % (_LETTER, _NOLETTER))
+
 
 class UniMERNetImgDecode(object):
     """Class for decoding images for UniMERNet, including cropping margins, resizing, and padding."""
@@ -38,8 +48,7 @@ class UniMERNetImgDecode(object):
 
         Returns:
             PIL.Image.Image: The cropped image."""
-        data = np.array(img.convert("L"))
-        data = data.astype(np.uint8)
+        data = np.asarray(img.convert("L"))
         max_val = data.max()
         min_val = data.min()
         if max_val == min_val:
@@ -133,7 +142,11 @@ class UniMERNetImgDecode(object):
         Returns:
             numpy.ndarray: The decoded image array."""
         try:
-            img = self.crop_margin(Image.fromarray(img).convert("RGB"))
+            pil_img = Image.fromarray(img)
+            # 裁剪图像本身已是RGB时无需再convert, 避免每个公式多复制一份图像
+            if pil_img.mode != "RGB":
+                pil_img = pil_img.convert("RGB")
+            img = self.crop_margin(pil_img)
         except OSError:
             return
         if img.height == 0 or img.width == 0:
@@ -552,13 +565,9 @@ class UniMERNetDecode(object):
         Returns:
             str: Normalized string.
         """
-        text_reg = r"(\\(operatorname|mathrm|text|mathbf)\s?\*? {.*?})"
-        letter = "[a-zA-Z]"
-        noletter = r"[\W_^\d]"
         names = []
-        for x in re.findall(text_reg, s):
-            pattern = r"(\\[a-zA-Z]+)\s(?=\w)|\\[a-zA-Z]+\s(?=})"
-            matches = re.findall(pattern, x[0])
+        for x in NORMALIZE_TEXT_PATTERN.findall(s):
+            matches = NORMALIZE_COMMAND_PATTERN.findall(x[0])
             for m in matches:
                 if (
                         m
@@ -574,13 +583,15 @@ class UniMERNetDecode(object):
                     s = s.replace(" ", "")
                     names.append(s)
         if len(names) > 0:
-            s = re.sub(text_reg, lambda match: str(names.pop(0)), s)
+            # 用deque按顺序取出替换内容, 避免list.pop(0)每次移动整个列表
+            names = deque(names)
+            s = NORMALIZE_TEXT_PATTERN.sub(lambda match: str(names.popleft()), s)
         news = s
         while True:
             s = news
-            news = re.sub(r"(?!\\ )(%s)\s+?(%s)" % (noletter, noletter), r"\1\2", s)
-            news = re.sub(r"(?!\\ )(%s)\s+?(%s)" % (noletter, letter), r"\1\2", news)
-            news = re.sub(r"(%s)\s+?(%s)" % (letter, noletter), r"\1\2", news)
+            news = NOLETTER_NOLETTER_SPACE_PATTERN.sub(r"\1\2", s)
+            news = NOLETTER_LETTER_SPACE_PATTERN.sub(r"\1\2", news)
+            news = LETTER_NOLETTER_SPACE_PATTERN.sub(r"\1\2", news)
             if news == s:
                 break
         return s.replace("XXXXXXX", " ")
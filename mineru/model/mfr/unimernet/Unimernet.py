@@ -2,6 +2,9 @@ import torch
 from torch.utils.data import DataLoader, Dataset
 from tqdm import tqdm
 
+from mineru.utils.model_utils import boxes_to_lists
+from mineru.utils.os_env_config import get_mfr_num_workers
+
 
 class MathDataset(Dataset):
     def __init__(self, image_paths, transform=None):
@@ -30,36 +33,22 @@ class UnimernetModel(object):
         if not _device_.startswith("cpu"):
             self.model = self.model.to(dtype=torch.float16)
         self.model.eval()
-
-    def predict(self, mfd_res, image):
-        formula_list = []
-        mf_image_list = []
-        for xyxy, conf, cla in zip(
-            mfd_res.boxes.xyxy.cpu(), mfd_res.boxes.conf.cpu(), mfd_res.boxes.cls.cpu()
-        ):
-            xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]
-            new_item = {
-                "category_id": 13 + int(cla.item()),
-                "poly": [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
-                "score": round(float(conf.item()), 2),
-                "latex": "",
-            }
-            formula_list.append(new_item)
-            bbox_img = image[ymin:ymax, xmin:xmax]
-            mf_image_list.append(bbox_img)
-
-        dataset = MathDataset(mf_image_list, transform=self.model.transform)
-        dataloader = DataLoader(dataset, batch_size=32, num_workers=0)
-        mfr_res = []
-        for mf_img in dataloader:
-            mf_img = mf_img.to(dtype=self.model.dtype)
-            mf_img = mf_img.to(self.device)
-            with torch.no_grad():
-                output = self.model.generate({"image": mf_img})
-            mfr_res.extend(output["fixed_str"])
-        for res, latex in zip(formula_list, mfr_res):
-            res["latex"] = latex
-        return formula_list
+        self.num_workers = get_mfr_num_workers()
+        # 使用锁页内存, 使主机到显存的拷贝可以异步进行
+        self.pin_memory = _device_.startswith("cuda")
+
+    def _build_dataloader(self, dataset, batch_size):
+        # num_workers>0时在子进程中完成裁边/缩放/归一化, 与GPU上的生成过程重叠
+        return DataLoader(
+            dataset,
+            batch_size=batch_size,
+            num_workers=self.num_workers,
+            pin_memory=self.pin_memory,
+        )
+
+    def predict(self, mfd_res, image, batch_size: int = 32):
+        # 单页预测复用批量预测的流程(按面积排序、分批生成、回填结果)
+        return self.batch_predict([mfd_res], [image], batch_size=batch_size)[0]
 
     def batch_predict(self, images_mfd_res: list, images: list, batch_size: int = 64) -> list:
         images_formula_list = []
@@ -73,14 +62,11 @@ class UnimernetModel(object):
             image = images[image_index]
             formula_list = []
 
-            for idx, (xyxy, conf, cla) in enumerate(zip(
-                    mfd_res.boxes.xyxy, mfd_res.boxes.conf, mfd_res.boxes.cls
-            )):
-                xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]
+            for (xmin, ymin, xmax, ymax), conf, cla in zip(*boxes_to_lists(mfd_res.boxes)):
                 new_item = {
-                    "category_id": 13 + int(cla.item()),
+                    "category_id": 13 + cla,
                     "poly": [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
-                    "score": round(float(conf.item()), 2),
+                    "score": round(conf, 2),
                     "latex": "",
                 }
                 formula_list.append(new_item)
@@ -108,7 +94,7 @@ class UnimernetModel(object):
         # 如果batch_size > len(sorted_images)，则设置为不超过len(sorted_images)的2的幂
         batch_size = min(batch_size, max(1, 2 ** (len(sorted_images).bit_length() - 1))) if sorted_images else 1
 
-        dataloader = DataLoader(dataset, batch_size=batch_size, num_workers=0)
+        dataloader = self._build_dataloader(dataset, batch_size=batch_size)
 
         # Process batches and store results
         mfr_res = []
@@ -116,8 +102,8 @@ class UnimernetModel(object):
 
         with tqdm(total=len(sorted_images), desc="MFR Predict") as pbar:
             for index, mf_img in enumerate(dataloader):
+                mf_img = mf_img.to(self.device, non_blocking=True)
                 mf_img = mf_img.to(dtype=self.model.dtype)
-                mf_img = mf_img.to(self.device)
                 with torch.no_grad():
                     output = self.model.generate({"image": mf_img}, batch_size=batch_size)
                 mfr_res.extend(output["fixed_str"])
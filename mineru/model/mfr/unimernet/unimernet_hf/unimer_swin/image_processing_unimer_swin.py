@@ -54,11 +54,18 @@ class UnimerSwinImageProcessor(BaseImageProcessor):
             gray = img.copy()
 
         # Normalize and threshold
-        if gray.max() == gray.min():
+        min_val, max_val = gray.min(), gray.max()
+        if max_val == min_val:
             return img
 
-        normalized = (((gray - gray.min()) / (gray.max() - gray.min())) * 255).astype(np.uint8)
-        binary = 255 * (normalized < 200).astype(np.uint8)
+        if gray.dtype == np.uint8:
+            # 阈值结果只取决于灰度值, 先对256个灰度级计算再查表, 避免对整幅图做浮点运算
+            levels = np.arange(256, dtype=np.uint8)
+            normalized_levels = (((levels - min_val) / (max_val - min_val)) * 255).astype(np.uint8)
+            binary = cv2.LUT(gray, 255 * (normalized_levels < 200).astype(np.uint8))
+        else:
+            normalized = (((gray - min_val) / (max_val - min_val)) * 255).astype(np.uint8)
+            binary = 255 * (normalized < 200).astype(np.uint8)
 
         # Find bounding box
         coords = cv2.findNonZero(binary)  # Find all non-zero points (text)
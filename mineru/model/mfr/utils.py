@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 LEFT_PATTERN = re.compile(r'(\\left)(\S*)')
 RIGHT_PATTERN = re.compile(r'(\\right)(\S*)')
@@ -206,6 +207,10 @@ def fix_unbalanced_braces(latex_formula):
     return ''.join(char for i, char in enumerate(latex_formula) if i not in unmatched)
 
 
+# 匹配\后面跟一个字符的情况
+BACKSLASH_CHAR_PATTERN = re.compile(r'\\(.)')
+
+
 def process_latex(input_string):
     """
         处理LaTeX公式中的反斜杠：
@@ -238,10 +243,7 @@ def process_latex(input_string):
         # 其他情况，在\后添加空格
         return '\\' + ' ' + next_char
 
-    # 匹配\后面跟一个字符的情况
-    pattern = r'\\(.)'
-
-    return re.sub(pattern, replace_func, input_string)
+    return BACKSLASH_CHAR_PATTERN.sub(replace_func, input_string)
 
 # 常见的在KaTeX/MathJax中可用的数学环境
 ENV_TYPES = ['array', 'matrix', 'pmatrix', 'bmatrix', 'vmatrix',
@@ -293,11 +295,13 @@ REPLACEMENTS_PATTERNS = {
     re.compile(r'\\copyright'): r'©',
 }
 QQUAD_PATTERN = re.compile(r'\\qquad(?!\s)')
+UP_PATTERN = re.compile(r'\\up([a-zA-Z]+)')
+COMMANDS_TO_REMOVE_PATTERN = re.compile(
+    r'\\(?:lefteqn|boldmath|ensuremath|centering|textsubscript|sides|textsl|textcent|emph|protect|null)')
 
 
 def remove_up_commands(s: str):
     """Remove unnecessary up commands from LaTeX code."""
-    UP_PATTERN = re.compile(r'\\up([a-zA-Z]+)')
     s = UP_PATTERN.sub(
         lambda m: m.group(0) if m.group(1) in ["arrow", "downarrow", "lus", "silon"] else f"\\{m.group(1)}", s
     )
@@ -306,12 +310,15 @@ def remove_up_commands(s: str):
 
 def remove_unsupported_commands(s: str):
     """Remove unsupported LaTeX commands."""
-    COMMANDS_TO_REMOVE_PATTERN = re.compile(
-        r'\\(?:lefteqn|boldmath|ensuremath|centering|textsubscript|sides|textsl|textcent|emph|protect|null)')
     s = COMMANDS_TO_REMOVE_PATTERN.sub('', s)
     return s
 
 
+LATEX_RM_WHITESPACE_CACHE_SIZE = 4096
+
+
+# 同一文档中常有大量重复的公式片段, 结果只取决于输入字符串, 可直接缓存
+@lru_cache(maxsize=LATEX_RM_WHITESPACE_CACHE_SIZE)
 def latex_rm_whitespace(s: str):
     """Remove unnecessary whitespace from LaTeX code."""
     s = fix_unbalanced_braces(s)
@@ -214,7 +214,7 @@ class PaddleOrientationClsModel:
                 bgr_img = img["table_img_bgr"]
                 h, w = bgr_img.shape[:2]
                 # 创建目标尺寸的白色背景
-                padded_img = np.ones((target_h, target_w, 3), dtype=np.uint8) * 255
+                padded_img = np.full((target_h, target_w, 3), 255, dtype=np.uint8)
                 # 将原图像粘贴到左上角
                 padded_img[:h, :w] = bgr_img
                 batch_images.append(padded_img)
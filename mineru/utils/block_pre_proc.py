@@ -1,7 +1,7 @@
 # Copyright (c) Opendatalab. All rights reserved.
 from mineru.utils.boxbase import (
-    calculate_iou,
-    calculate_overlap_area_in_bbox1_area_ratio,
+    calculate_iou_matrix,
+    calculate_overlap_area_in_bbox1_area_ratio_matrix,
     calculate_vertical_projection_overlap_ratio,
     get_minbox_if_overlap_by_ratio
 )
@@ -125,11 +125,13 @@ def fix_text_overlap_title_blocks(all_bboxes):
 
     need_remove = []
 
-    for text_block in text_blocks:
-        for title_block in title_blocks:
-            text_block_bbox = text_block[:4]
-            title_block_bbox = title_block[:4]
-            if calculate_iou(text_block_bbox, title_block_bbox) > 0.8:
+    # text与title两两之间的iou一次性批量计算
+    high_iou_matrix = calculate_iou_matrix(
+        [text_block[:4] for text_block in text_blocks], [title_block[:4] for title_block in title_blocks]
+    ) > 0.8
+    for i in range(len(text_blocks)):
+        for j, title_block in enumerate(title_blocks):
+            if high_iou_matrix[i, j]:
                 if title_block not in need_remove:
                     need_remove.append(title_block)
 
@@ -142,18 +144,14 @@ def fix_text_overlap_title_blocks(all_bboxes):
 
 def remove_need_drop_blocks(all_bboxes, discarded_blocks):
     need_remove = []
-    for block in all_bboxes:
-        for discarded_block in discarded_blocks:
-            block_bbox = block[:4]
-            if (
-                calculate_overlap_area_in_bbox1_area_ratio(
-                    block_bbox, discarded_block['bbox']
-                )
-                > 0.6
-            ):
-                if block not in need_remove:
-                    need_remove.append(block)
-                    break
+    # 所有block与discarded block的重叠比例一次性批量计算
+    overlap_discarded = (calculate_overlap_area_in_bbox1_area_ratio_matrix(
+        [block[:4] for block in all_bboxes], [discarded_block['bbox'] for discarded_block in discarded_blocks]
+    ) > 0.6).any(axis=1)
+    for i, block in enumerate(all_bboxes):
+        if overlap_discarded[i]:
+            if block not in need_remove:
+                need_remove.append(block)
 
     if len(need_remove) > 0:
         for block in need_remove:
@@ -174,11 +172,14 @@ def fix_interline_equation_overlap_text_blocks_with_hi_iou(all_bboxes):
 
     need_remove = []
 
-    for interline_equation_block in interline_equation_blocks:
-        for text_block in text_blocks:
-            interline_equation_block_bbox = interline_equation_block[:4]
-            text_block_bbox = text_block[:4]
-            if calculate_iou(interline_equation_block_bbox, text_block_bbox) > 0.8:
+    # 行间公式与text两两之间的iou一次性批量计算
+    high_iou_matrix = calculate_iou_matrix(
+        [interline_equation_block[:4] for interline_equation_block in interline_equation_blocks],
+        [text_block[:4] for text_block in text_blocks],
+    ) > 0.8
+    for i in range(len(interline_equation_blocks)):
+        for j, text_block in enumerate(text_blocks):
+            if high_iou_matrix[i, j]:
                 if text_block not in need_remove:
                     need_remove.append(text_block)
 
@@ -127,7 +127,7 @@ def sort_lines_by_model(fix_blocks, page_w, page_h, line_height, footnote_blocks
         boxes.append([left, top, right, bottom])
     model_manager = ModelSingleton()
     model = model_manager.get_model('layoutreader')
-    with torch.no_grad():
+    with torch.inference_mode():
         orders = do_predict(boxes, model)
     sorted_bboxes = [page_line_list[i] for i in orders]
 
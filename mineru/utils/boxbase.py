@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def is_in(box1, box2) -> bool:
     """box1是否完全在box2里面."""
@@ -47,22 +49,23 @@ def bbox_distance(bbox1, bbox2):
         float: 矩形框之间的距离。
     """
 
-    def dist(point1, point2):
-        return math.sqrt((point1[0] - point2[0]) ** 2 + (point1[1] - point2[1]) ** 2)
-
     x1, y1, x1b, y1b = bbox1
     x2, y2, x2b, y2b = bbox2
 
-    left, right, bottom, top = bbox_relative_pos(bbox1, bbox2)
+    # 与bbox_relative_pos相同的判断, 直接内联, 避免额外的函数调用和元组构造
+    left = x2b < x1
+    right = x1b < x2
+    bottom = y2b < y1
+    top = y1b < y2
 
     if top and left:
-        return dist((x1, y1b), (x2b, y2))
+        return math.sqrt((x1 - x2b) ** 2 + (y1b - y2) ** 2)
     elif left and bottom:
-        return dist((x1, y1), (x2b, y2b))
+        return math.sqrt((x1 - x2b) ** 2 + (y1 - y2b) ** 2)
     elif bottom and right:
-        return dist((x1b, y1), (x2, y2b))
+        return math.sqrt((x1b - x2) ** 2 + (y1 - y2b) ** 2)
     elif right and top:
-        return dist((x1b, y1b), (x2, y2))
+        return math.sqrt((x1b - x2) ** 2 + (y1b - y2) ** 2)
     elif left:
         return x1 - x2b
     elif right:
@@ -81,7 +84,13 @@ def get_minbox_if_overlap_by_ratio(bbox1, bbox2, ratio):
     x2_min, y2_min, x2_max, y2_max = bbox2
     area1 = (x1_max - x1_min) * (y1_max - y1_min)
     area2 = (x2_max - x2_min) * (y2_max - y2_min)
-    overlap_ratio = calculate_overlap_area_2_minbox_area_ratio(bbox1, bbox2)
+    # 复用已算出的两个面积, 等价于calculate_overlap_area_2_minbox_area_ratio, 但不再重复计算面积
+    intersection_area = _intersection_area(bbox1, bbox2)
+    min_box_area = min(area1, area2)
+    if intersection_area == 0 or min_box_area == 0:
+        overlap_ratio = 0.0
+    else:
+        overlap_ratio = intersection_area / min_box_area
     if overlap_ratio > ratio:
         if area1 <= area2:
             return bbox1
@@ -91,21 +100,23 @@ def get_minbox_if_overlap_by_ratio(bbox1, bbox2, ratio):
         return None
 
 
+def _intersection_area(bbox1, bbox2):
+    """计算两个bbox的重叠面积, 不相交时返回0.0, 各重叠比例计算共用."""
+    width = min(bbox1[2], bbox2[2]) - max(bbox1[0], bbox2[0])
+    height = min(bbox1[3], bbox2[3]) - max(bbox1[1], bbox2[1])
+    if width < 0 or height < 0:
+        return 0.0
+    return width * height
+
+
 def calculate_overlap_area_2_minbox_area_ratio(bbox1, bbox2):
     """计算box1和box2的重叠面积占最小面积的box的比例."""
-    # Determine the coordinates of the intersection rectangle
-    x_left = max(bbox1[0], bbox2[0])
-    y_top = max(bbox1[1], bbox2[1])
-    x_right = min(bbox1[2], bbox2[2])
-    y_bottom = min(bbox1[3], bbox2[3])
-
-    if x_right < x_left or y_bottom < y_top:
+    intersection_area = _intersection_area(bbox1, bbox2)
+    if intersection_area == 0:
         return 0.0
 
-    # The area of overlap area
-    intersection_area = (x_right - x_left) * (y_bottom - y_top)
-    min_box_area = min([(bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1]),
-                        (bbox2[3] - bbox2[1]) * (bbox2[2] - bbox2[0])])
+    min_box_area = min((bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1]),
+                       (bbox2[3] - bbox2[1]) * (bbox2[2] - bbox2[0]))
     if min_box_area == 0:
         return 0
     else:
@@ -122,23 +133,16 @@ def calculate_iou(bbox1, bbox2):
     Returns:
         float: 两个边界框的交并比(IOU)，取值范围为 [0, 1]。
     """
-    # Determine the coordinates of the intersection rectangle
-    x_left = max(bbox1[0], bbox2[0])
-    y_top = max(bbox1[1], bbox2[1])
-    x_right = min(bbox1[2], bbox2[2])
-    y_bottom = min(bbox1[3], bbox2[3])
-
-    if x_right < x_left or y_bottom < y_top:
-        return 0.0
-
     # The area of overlap area
-    intersection_area = (x_right - x_left) * (y_bottom - y_top)
+    intersection_area = _intersection_area(bbox1, bbox2)
+    if intersection_area == 0:
+        return 0.0
 
     # The area of both rectangles
     bbox1_area = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
     bbox2_area = (bbox2[2] - bbox2[0]) * (bbox2[3] - bbox2[1])
 
-    if any([bbox1_area == 0, bbox2_area == 0]):
+    if bbox1_area == 0 or bbox2_area == 0:
         return 0
 
     # Compute the intersection over union by taking the intersection area
@@ -150,17 +154,10 @@ def calculate_iou(bbox1, bbox2):
 
 def calculate_overlap_area_in_bbox1_area_ratio(bbox1, bbox2):
     """计算box1和box2的重叠面积占bbox1的比例."""
-    # Determine the coordinates of the intersection rectangle
-    x_left = max(bbox1[0], bbox2[0])
-    y_top = max(bbox1[1], bbox2[1])
-    x_right = min(bbox1[2], bbox2[2])
-    y_bottom = min(bbox1[3], bbox2[3])
-
-    if x_right < x_left or y_bottom < y_top:
+    intersection_area = _intersection_area(bbox1, bbox2)
+    if intersection_area == 0:
         return 0.0
 
-    # The area of overlap area
-    intersection_area = (x_right - x_left) * (y_bottom - y_top)
     bbox1_area = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
     if bbox1_area == 0:
         return 0
@@ -200,4 +197,67 @@ def calculate_vertical_projection_overlap_ratio(block1, block2):
 
     # Proportion of the x-axis covered by the intersection
     # logger.info(f"intersection_length: {intersection_length}, block1_length: {block1_length}")
-    return intersection_length / block1_length
\ No newline at end of file
+    return intersection_length / block1_length
+
+
+def _as_bbox_array(bboxes):
+    """将bbox列表转换为(N, 4)的float64数组, 空列表同样返回(0, 4)形状."""
+    return np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+
+
+def _intersection_area_matrix(bboxes1, bboxes2):
+    """计算两组bbox两两之间的重叠面积, 返回(N, M)矩阵, 不相交时为0."""
+    x_left = np.maximum(bboxes1[:, None, 0], bboxes2[None, :, 0])
+    y_top = np.maximum(bboxes1[:, None, 1], bboxes2[None, :, 1])
+    x_right = np.minimum(bboxes1[:, None, 2], bboxes2[None, :, 2])
+    y_bottom = np.minimum(bboxes1[:, None, 3], bboxes2[None, :, 3])
+    return np.clip(x_right - x_left, 0, None) * np.clip(y_bottom - y_top, 0, None)
+
+
+def calculate_iou_matrix(bboxes1, bboxes2):
+    """批量计算两组边界框两两之间的交并比, 结果与逐对调用calculate_iou一致.
+
+    Args:
+        bboxes1: N个边界框, 格式为 [[x1, y1, x2, y2], ...] 或 (N, 4) 数组
+        bboxes2: M个边界框, 格式与 `bboxes1` 相同
+
+    Returns:
+        np.ndarray: (N, M) 的交并比矩阵, 任一框面积为0时对应位置为0
+    """
+    bboxes1 = _as_bbox_array(bboxes1)
+    bboxes2 = _as_bbox_array(bboxes2)
+    intersection_area = _intersection_area_matrix(bboxes1, bboxes2)
+    bbox1_area = (bboxes1[:, 2] - bboxes1[:, 0]) * (bboxes1[:, 3] - bboxes1[:, 1])
+    bbox2_area = (bboxes2[:, 2] - bboxes2[:, 0]) * (bboxes2[:, 3] - bboxes2[:, 1])
+    union_area = bbox1_area[:, None] + bbox2_area[None, :] - intersection_area
+    valid = (bbox1_area[:, None] != 0) & (bbox2_area[None, :] != 0)
+    return np.divide(intersection_area, union_area, out=np.zeros_like(intersection_area), where=valid)
+
+
+def calculate_overlap_area_in_bbox1_area_ratio_matrix(bboxes1, bboxes2):
+    """批量计算bboxes1中每个框与bboxes2中每个框的重叠面积占bboxes1中框面积的比例.
+
+    结果与逐对调用calculate_overlap_area_in_bbox1_area_ratio一致, 返回(N, M)矩阵.
+    """
+    bboxes1 = _as_bbox_array(bboxes1)
+    bboxes2 = _as_bbox_array(bboxes2)
+    intersection_area = _intersection_area_matrix(bboxes1, bboxes2)
+    bbox1_area = (bboxes1[:, 2] - bboxes1[:, 0]) * (bboxes1[:, 3] - bboxes1[:, 1])
+    bbox1_area = np.broadcast_to(bbox1_area[:, None], intersection_area.shape)
+    return np.divide(intersection_area, bbox1_area, out=np.zeros_like(intersection_area), where=bbox1_area != 0)
+
+
+def is_in_matrix(bboxes1, bboxes2):
+    """批量判断bboxes1中的每个框是否完全在bboxes2的每个框里面, 结果与逐对调用is_in一致.
+
+    Returns:
+        np.ndarray: (N, M) 的布尔矩阵
+    """
+    bboxes1 = _as_bbox_array(bboxes1)
+    bboxes2 = _as_bbox_array(bboxes2)
+    return (
+        (bboxes1[:, None, 0] >= bboxes2[None, :, 0])
+        & (bboxes1[:, None, 1] >= bboxes2[None, :, 1])
+        & (bboxes1[:, None, 2] <= bboxes2[None, :, 2])
+        & (bboxes1[:, None, 3] <= bboxes2[None, :, 3])
+    )
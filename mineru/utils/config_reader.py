@@ -1,6 +1,7 @@
 # Copyright (c) Opendatalab. All rights reserved.
 import json
 import os
+from functools import lru_cache
 from loguru import logger
 
 try:
@@ -14,6 +15,10 @@ except ImportError:
 CONFIG_FILE_NAME = os.getenv('MINERU_TOOLS_CONFIG_JSON', 'mineru.json')
 
 
+# 已解析的配置缓存, key为(配置文件路径, 修改时间), 文件被修改后自动重新读取
+_config_cache = {}
+
+
 def read_config():
     if os.path.isabs(CONFIG_FILE_NAME):
         config_file = CONFIG_FILE_NAME
@@ -21,13 +26,20 @@ def read_config():
         home_dir = os.path.expanduser('~')
         config_file = os.path.join(home_dir, CONFIG_FILE_NAME)
 
-    if not os.path.exists(config_file):
+    try:
+        mtime_ns = os.stat(config_file).st_mtime_ns
+    except OSError:
         # logger.warning(f'{config_file} not found, using default configuration')
         return None
-    else:
+
+    cache_key = (config_file, mtime_ns)
+    config = _config_cache.get(cache_key)
+    if config is None:
         with open(config_file, 'r', encoding='utf-8') as f:
             config = json.load(f)
-        return config
+        _config_cache.clear()
+        _config_cache[cache_key] = config
+    return config
 
 
 def get_s3_config(bucket_name: str):
@@ -77,17 +89,30 @@ def get_device():
     if device_mode is not None:
         return device_mode
     else:
-        if torch.cuda.is_available():
-            return "cuda"
-        elif torch.backends.mps.is_available():
-            return "mps"
-        else:
-            try:
-                if torch_npu.npu.is_available():
-                    return "npu"
-            except Exception as e:
-                pass
-        return "cpu"
+        return _detect_device()
+
+
+@lru_cache(maxsize=1)
+def _detect_device():
+    # 硬件探测结果在进程生命周期内不变, 只探测一次; 环境变量仍在每次调用时读取, 以便运行时修改生效
+    if torch.cuda.is_available():
+        return "cuda"
+    elif torch.backends.mps.is_available():
+        return "mps"
+    else:
+        try:
+            if torch_npu.npu.is_available():
+                return "npu"
+        except Exception as e:
+            pass
+    return "cpu"
+
+
+def get_layout_device(device):
+    # 可通过MINERU_LAYOUT_DEVICE将布局检测模型单独放到其他设备(如cpu), 为OCR等模型让出显存
+    layout_device_env = os.getenv('MINERU_LAYOUT_DEVICE')
+    layout_device = device if layout_device_env is None else layout_device_env
+    return layout_device
 
 
 def get_formula_enable(formula_enable):
@@ -21,7 +21,7 @@ def cut_image_and_table(span, page_pil_img, page_img_md5, page_id, image_writer,
 
 
 def check_img_bbox(bbox) -> bool:
-    if any([bbox[0] >= bbox[2], bbox[1] >= bbox[3]]):
+    if bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
         logger.warning(f"image_bboxes: 错误的box, {bbox}")
         return False
     return True
@@ -4,25 +4,23 @@ import json
 
 
 def bytes_md5(file_bytes):
-    hasher = hashlib.md5()
-    hasher.update(file_bytes)
-    return hasher.hexdigest().upper()
+    # 一次性构造哈希对象, 支持bytes/memoryview等任意缓冲区, 大块数据哈希时hashlib会释放GIL
+    return hashlib.md5(file_bytes).hexdigest().upper()
 
 
 def str_md5(input_string):
-    hasher = hashlib.md5()
     # 在Python3中，需要将字符串转化为字节对象才能被哈希函数处理
-    input_bytes = input_string.encode('utf-8')
-    hasher.update(input_bytes)
-    return hasher.hexdigest()
+    return hashlib.md5(input_string.encode('utf-8')).hexdigest()
 
 
 def str_sha256(input_string):
-    hasher = hashlib.sha256()
     # 在Python3中，需要将字符串转化为字节对象才能被哈希函数处理
-    input_bytes = input_string.encode('utf-8')
-    hasher.update(input_bytes)
-    return hasher.hexdigest()
+    return bytes_sha256(input_string.encode('utf-8'))
+
+
+def bytes_sha256(input_bytes):
+    # 一次性构造哈希对象, 省去单独的update调用; OpenSSL会自动选用CPU的SHA扩展指令
+    return hashlib.sha256(input_bytes).hexdigest()
 
 
 def dict_md5(d):
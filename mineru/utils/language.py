@@ -1,5 +1,7 @@
 import os
+import re
 import unicodedata
+from functools import lru_cache
 
 if not os.getenv("FTLANG_CACHE"):
     current_file_path = os.path.abspath(__file__)
@@ -12,9 +14,16 @@ if not os.getenv("FTLANG_CACHE"):
 from fast_langdetect import detect_language
 
 
+SURROGATE_PATTERN = re.compile('[\ud800-\udfff]')
+
+
 def remove_invalid_surrogates(text):
-    # 移除无效的 UTF-16 代理对
-    return ''.join(c for c in text if not (0xD800 <= ord(c) <= 0xDFFF))
+    # 移除无效的 UTF-16 代理对, 用正则在C层完成扫描, 避免逐字符的Python循环
+    return SURROGATE_PATTERN.sub('', text)
+
+
+# 页眉页脚、页码等短文本在文档中大量重复, 对短文本的检测结果做缓存
+DETECT_LANG_CACHE_MAX_TEXT_LEN = 256
 
 
 def detect_lang(text: str) -> str:
@@ -22,6 +31,18 @@ def detect_lang(text: str) -> str:
     if len(text) == 0:
         return ""
 
+    if len(text) < DETECT_LANG_CACHE_MAX_TEXT_LEN:
+        return _detect_lang_cached(text)
+    return _detect_lang(text)
+
+
+@lru_cache(maxsize=4096)
+def _detect_lang_cached(text: str) -> str:
+    return _detect_lang(text)
+
+
+def _detect_lang(text: str) -> str:
+
     text = text.replace("\n", "")
     text = remove_invalid_surrogates(text)
 
@@ -2,7 +2,10 @@
 包含两个MagicModel类中重复使用的方法和逻辑
 """
 from typing import List, Dict, Any, Callable
-from mineru.utils.boxbase import bbox_distance, is_in
+
+import numpy as np
+
+from mineru.utils.boxbase import bbox_distance, is_in_matrix
 
 
 def reduct_overlap(bboxes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -16,13 +19,11 @@ def reduct_overlap(bboxes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         去重后的bbox列表
     """
     N = len(bboxes)
-    keep = [True] * N
-    for i in range(N):
-        for j in range(N):
-            if i == j:
-                continue
-            if is_in(bboxes[i]['bbox'], bboxes[j]['bbox']):
-                keep[i] = False
+    # 一次性批量计算两两包含关系, 被其他任意bbox包含(不含自身)的bbox不保留
+    boxes = [bbox['bbox'] for bbox in bboxes]
+    contained = is_in_matrix(boxes, boxes)
+    np.fill_diagonal(contained, False)
+    keep = ~contained.any(axis=1)
     return [bboxes[i] for i in range(N) if keep[i]]
 
 
@@ -66,18 +67,25 @@ def tie_up_category_by_distance_v3(
     ]
     seen_idx = set()
     seen_sub_idx = set()
+    # 客体到所有主体的最近距离只与客体本身有关, 缓存起来避免每轮循环重新扫描全部主体
+    obj_nearest_sub_dis = {}
 
     while N > len(seen_sub_idx):
+        # 一次遍历同时筛选候选框并求出最左和最上的坐标
         candidates = []
-        for idx, kind, x0, y0 in all_boxes_with_idx:
+        left_x = top_y = float("inf")
+        for candidate in all_boxes_with_idx:
+            idx, kind, x0, y0 = candidate
             if idx in seen_idx:
                 continue
-            candidates.append((idx, kind, x0, y0))
+            candidates.append(candidate)
+            if x0 < left_x:
+                left_x = x0
+            if y0 < top_y:
+                top_y = y0
 
         if len(candidates) == 0:
             break
-        left_x = min([v[2] for v in candidates])
-        top_y = min([v[3] for v in candidates])
 
         candidates.sort(key=lambda x: (x[2] - left_x) ** 2 + (x[3] - top_y) ** 2)
 
@@ -101,11 +109,14 @@ def tie_up_category_by_distance_v3(
             sub_idx, obj_idx = nxt[0], fst_idx - OBJ_IDX_OFFSET
 
         pair_dis = bbox_distance(subjects[sub_idx]["bbox"], objects[obj_idx]["bbox"])
-        nearest_dis = float("inf")
-        for i in range(N):
-            # 取消原先算法中 1对1 匹配的偏置
-            # if i in seen_idx or i == sub_idx:continue
-            nearest_dis = min(nearest_dis, bbox_distance(subjects[i]["bbox"], objects[obj_idx]["bbox"]))
+        nearest_dis = obj_nearest_sub_dis.get(obj_idx)
+        if nearest_dis is None:
+            nearest_dis = float("inf")
+            for i in range(N):
+                # 取消原先算法中 1对1 匹配的偏置
+                # if i in seen_idx or i == sub_idx:continue
+                nearest_dis = min(nearest_dis, bbox_distance(subjects[i]["bbox"], objects[obj_idx]["bbox"]))
+            obj_nearest_sub_dis[obj_idx] = nearest_dis
 
         if pair_dis >= 3 * nearest_dis:
             seen_idx.add(sub_idx)
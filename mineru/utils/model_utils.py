@@ -1,11 +1,13 @@
 import os
 import time
 import gc
+from functools import lru_cache
 from PIL import Image
 from loguru import logger
 import numpy as np
 
 from mineru.utils.boxbase import get_minbox_if_overlap_by_ratio
+from mineru.utils.os_env_config import get_cuda_ipc_collect_enable
 
 try:
     import torch
@@ -14,6 +16,11 @@ except ImportError:
     pass
 
 
+# layout检测结果中公式区域和需要OCR区域的category_id
+FORMULA_CATEGORY_IDS = frozenset({13, 14})
+OCR_CATEGORY_IDS = frozenset({0, 2, 4, 6, 7, 3})
+
+
 def crop_img(input_res, input_img, crop_paste_x=0, crop_paste_y=0):
 
     crop_xmin, crop_ymin = int(input_res['poly'][0]), int(input_res['poly'][1])
@@ -26,7 +33,7 @@ def crop_img(input_res, input_img, crop_paste_x=0, crop_paste_y=0):
     if isinstance(input_img, np.ndarray):
 
         # Create a white background array
-        return_image = np.ones((crop_new_height, crop_new_width, 3), dtype=np.uint8) * 255
+        return_image = np.full((crop_new_height, crop_new_width, 3), 255, dtype=np.uint8)
 
         # Crop the original image using numpy slicing
         cropped_img = input_img[crop_ymin:crop_ymax, crop_xmin:crop_xmax]
@@ -342,6 +349,31 @@ def remove_overlaps_low_confidence_blocks(combined_res_list, overlap_threshold=0
     return blocks_to_remove
 
 
+def split_batches_by_image_size(images, batch_size):
+    """按图片尺寸分组后再切分batch, 返回每个batch中图片在images中的下标.
+
+    同一batch内图片尺寸一致时, YOLO的letterbox只需补齐到stride的整数倍, 尺寸混杂时则会统一补成正方形, 白白计算大量填充区域.
+    """
+    size_groups = {}
+    for index, image in enumerate(images):
+        size = image.size if isinstance(image, Image.Image) else image.shape[:2]
+        size_groups.setdefault(size, []).append(index)
+
+    batches = []
+    for indices in size_groups.values():
+        for start in range(0, len(indices), batch_size):
+            batches.append(indices[start: start + batch_size])
+    return batches
+
+
+def boxes_to_lists(boxes):
+    """将YOLO检测结果的boxes一次性转到CPU, 返回python原生类型的(xyxy_list, conf_list, cls_list), 避免逐个box的tensor取值."""
+    xyxy_list = boxes.xyxy.cpu().numpy().astype(np.int32).tolist()
+    conf_list = boxes.conf.cpu().numpy().tolist()
+    cls_list = boxes.cls.cpu().numpy().astype(np.int32).tolist()
+    return xyxy_list, conf_list, cls_list
+
+
 def get_res_list_from_layout_res(layout_res, iou_threshold=0.7, overlap_threshold=0.8, area_threshold=0.8):
     """Extract OCR, table and other regions from layout results."""
     ocr_res_list = []
@@ -354,17 +386,17 @@ def get_res_list_from_layout_res(layout_res, iou_threshold=0.7, overlap_threshol
     for i, res in enumerate(layout_res):
         category_id = int(res['category_id'])
 
-        if category_id in [13, 14]:  # Formula regions
+        if category_id in FORMULA_CATEGORY_IDS:  # Formula regions
             single_page_mfdetrec_res.append({
                 "bbox": [int(res['poly'][0]), int(res['poly'][1]),
                          int(res['poly'][4]), int(res['poly'][5])],
             })
-        elif category_id in [0, 2, 4, 6, 7, 3]:  # OCR regions
+        elif category_id in OCR_CATEGORY_IDS:  # OCR regions
             ocr_res_list.append(res)
         elif category_id == 5:  # Table regions
             table_res_list.append(res)
             table_indices.append(i)
-        elif category_id in [1]:  # Text regions
+        elif category_id == 1:  # Text regions
             text_res_list.append(res)
 
     # Process tables: merge high IoU tables first, then filter nested tables
@@ -413,17 +445,54 @@ def get_res_list_from_layout_res(layout_res, iou_threshold=0.7, overlap_threshol
     return ocr_res_list, filtered_table_res_list, single_page_mfdetrec_res
 
 
+@lru_cache(maxsize=None)
+def is_cuda_available() -> bool:
+    # 设备可用性在进程生命周期内不会变化, 只探测一次, 避免每页清理时都访问驱动
+    return torch.cuda.is_available()
+
+
+@lru_cache(maxsize=None)
+def is_npu_available() -> bool:
+    return torch_npu.npu.is_available()
+
+
+# gc.get_count() 第三项为上次全量回收后第1代回收的次数, 超过该值时才做全量回收
+FULL_GC_GEN1_COLLECTIONS = 5
+# gc.get_count() 第二项为上次第1代回收后第0代回收的次数, 超过该值时回收到第1代
+GEN1_GC_GEN0_COLLECTIONS = 5
+
+
+def collect_garbage():
+    """按各代计数选择回收的代数, 只在老年代积累足够对象时才遍历整个堆."""
+    _, gen0_collections, gen1_collections = gc.get_count()
+    if gen1_collections > FULL_GC_GEN1_COLLECTIONS:
+        generation = 2
+    elif gen0_collections > GEN1_GC_GEN0_COLLECTIONS:
+        generation = 1
+    else:
+        generation = 0
+    return gc.collect(generation)
+
+
 def clean_memory(device='cuda'):
+    """释放设备缓存显存.
+
+    torch.cuda.ipc_collect() 需要同步设备并扫描IPC句柄, 单进程推理中没有作用,
+    仅在设置环境变量 MINERU_CUDA_IPC_COLLECT=true 时调用.
+    """
+    # 先回收循环引用中的张量, 再释放显存缓存, 使回收出来的显存能一并归还
+    collect_garbage()
+    device = str(device)
     if device == 'cuda':
-        if torch.cuda.is_available():
+        if is_cuda_available():
             torch.cuda.empty_cache()
-            torch.cuda.ipc_collect()
-    elif str(device).startswith("npu"):
-        if torch_npu.npu.is_available():
+            if get_cuda_ipc_collect_enable():
+                torch.cuda.ipc_collect()
+    elif device.startswith("npu"):
+        if is_npu_available():
             torch_npu.npu.empty_cache()
-    elif str(device).startswith("mps"):
+    elif device.startswith("mps"):
         torch.mps.empty_cache()
-    gc.collect()
 
 
 def clean_vram(device, vram_threshold=8):
@@ -453,10 +522,10 @@ def get_vram(device) -> int:
 
     # 环境变量未配置或配置错误,根据device自动获取
     total_memory = 1
-    if torch.cuda.is_available() and str(device).startswith("cuda"):
+    if str(device).startswith("cuda") and is_cuda_available():
         total_memory = round(torch.cuda.get_device_properties(device).total_memory / (1024 ** 3))  # 将字节转换为 GB
     elif str(device).startswith("npu"):
-        if torch_npu.npu.is_available():
+        if is_npu_available():
             total_memory = round(torch_npu.npu.get_device_properties(device).total_memory / (1024 ** 3))  # 转为 GB
 
     return total_memory
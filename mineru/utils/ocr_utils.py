@@ -321,7 +321,7 @@ def get_adjusted_mfdetrec_res(single_page_mfdetrec_res, useful_list):
         x1 = mf_xmax - xmin + paste_x
         y1 = mf_ymax - ymin + paste_y
         # Filter formula blocks outside the graph
-        if any([x1 < 0, y1 < 0]) or any([x0 > new_width, y0 > new_height]):
+        if x1 < 0 or y1 < 0 or x0 > new_width or y0 > new_height:
             continue
         else:
             adjusted_mfdetrec_res.append({
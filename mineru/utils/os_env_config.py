@@ -11,6 +11,29 @@ def get_load_images_timeout() -> int:
     return get_value_from_string(env_value, 300)
 
 
+def get_cuda_ipc_collect_enable() -> bool:
+    # 默认关闭, 仅在多进程间共享CUDA张量时才需要回收IPC句柄
+    env_value = os.getenv('MINERU_CUDA_IPC_COLLECT', 'false')
+    return env_value.lower() == 'true'
+
+
+def get_mfr_num_workers() -> int:
+    # 公式识别DataLoader的预处理进程数, 默认0即在主进程中预处理
+    env_value = os.getenv('MINERU_MFR_NUM_WORKERS', None)
+    return get_value_from_string(env_value, 0)
+
+
+def get_cudnn_benchmark_enable() -> bool:
+    # 默认关闭, OCR等模型输入尺寸多变, 开启后反复autotune反而更慢
+    env_value = os.getenv('MINERU_CUDNN_BENCHMARK', 'false')
+    return env_value.lower() == 'true'
+
+
+def get_cuda_alloc_conf() -> str:
+    # 页面尺寸与batch大小不断变化时, 可扩展段能避免显存碎片化导致的OOM; 用户已配置时沿用用户的值
+    return os.getenv('PYTORCH_CUDA_ALLOC_CONF', 'expandable_segments:True')
+
+
 def get_value_from_string(env_value: str, default_value: int) -> int:
     if env_value is not None:
         try:
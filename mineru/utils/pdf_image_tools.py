@@ -77,7 +77,8 @@ def load_images_from_pdf(
             dpi,
             start_page_id,
             get_end_page_id(end_page_id, len(pdf_doc)),
-            image_type
+            image_type,
+            pdf_doc=pdf_doc,
         ), pdf_doc
     else:
         if timeout is None:
@@ -87,22 +88,25 @@ def load_images_from_pdf(
         # 计算总页数
         total_pages = end_page_id - start_page_id + 1
 
+        # 请求的页码范围内没有页面, 无需启动进程池
+        if total_pages <= 0:
+            return [], pdf_doc
+
         # 实际使用的进程数不超过总页数
         actual_threads = min(os.cpu_count() or 1, threads, total_pages)
 
-        # 根据实际进程数分组页面范围
-        pages_per_thread = max(1, total_pages // actual_threads)
+        # 根据实际进程数分组页面范围, 余数页平均分给前几个进程, 避免最后一个进程负载过重
+        pages_per_thread, remainder_pages = divmod(total_pages, actual_threads)
         page_ranges = []
 
+        range_start = start_page_id
         for i in range(actual_threads):
-            range_start = start_page_id + i * pages_per_thread
-            if i == actual_threads - 1:
-                # 最后一个进程处理剩余所有页面
-                range_end = end_page_id
-            else:
-                range_end = start_page_id + (i + 1) * pages_per_thread - 1
+            range_end = range_start + pages_per_thread - 1
+            if i < remainder_pages:
+                range_end += 1
 
             page_ranges.append((range_start, range_end))
+            range_start = range_end + 1
 
         # logger.debug(f"PDF to images using {actual_threads} processes, page ranges: {page_ranges}")
 
@@ -146,9 +150,13 @@ def load_images_from_pdf_core(
     start_page_id=0,
     end_page_id=None,
     image_type=ImageType.PIL,  # PIL or BASE64
+    pdf_doc: pdfium.PdfDocument | None = None,
 ):
+    """pdf_doc 为调用方已打开的文档时直接复用, 避免重复解析 PDF, 此时由调用方负责关闭"""
     images_list = []
-    pdf_doc = pdfium.PdfDocument(pdf_bytes)
+    own_pdf_doc = pdf_doc is None
+    if own_pdf_doc:
+        pdf_doc = pdfium.PdfDocument(pdf_bytes)
     pdf_page_num = len(pdf_doc)
     end_page_id = get_end_page_id(end_page_id, pdf_page_num)
 
@@ -158,7 +166,8 @@ def load_images_from_pdf_core(
         image_dict = pdf_page_to_image(page, dpi=dpi, image_type=image_type)
         images_list.append(image_dict)
 
-    pdf_doc.close()
+    if own_pdf_doc:
+        pdf_doc.close()
 
     return images_list
 
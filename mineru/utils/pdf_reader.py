@@ -18,7 +18,8 @@ def page_to_image(
     if (long_side_length*scale) > max_width_or_height:
         scale = max_width_or_height / long_side_length
 
-    bitmap: PdfBitmap = page.render(scale=scale)  # type: ignore
+    # rev_byteorder 让 pdfium 直接输出 RGB, to_pil 时无需再做 BGR->RGB 的逐像素转换
+    bitmap: PdfBitmap = page.render(scale=scale, rev_byteorder=True)  # type: ignore
 
     image = bitmap.to_pil()
     try:
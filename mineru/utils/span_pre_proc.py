@@ -7,10 +7,10 @@ import cv2
 import numpy as np
 from loguru import logger
 
-from mineru.utils.boxbase import calculate_overlap_area_in_bbox1_area_ratio, calculate_iou, \
-    get_minbox_if_overlap_by_ratio
+from mineru.utils.boxbase import calculate_overlap_area_in_bbox1_area_ratio, get_minbox_if_overlap_by_ratio, \
+    calculate_iou_matrix, calculate_overlap_area_in_bbox1_area_ratio_matrix
 from mineru.utils.enum_class import BlockType, ContentType
-from mineru.utils.pdf_image_tools import get_crop_img
+from mineru.utils.pdf_image_tools import get_crop_np_img
 from mineru.utils.pdf_text_tool import get_page
 
 
@@ -29,28 +29,30 @@ def remove_outside_spans(spans, all_bboxes, all_discarded_blocks):
     other_block_bboxes = get_block_bboxes(all_bboxes, other_block_type)
     discarded_block_bboxes = get_block_bboxes(all_discarded_blocks, [BlockType.DISCARDED])
 
+    # 所有span与各类block的重叠比例一次性批量计算, 避免逐对调用
+    span_bboxes = [span['bbox'] for span in spans]
+    in_discarded = (calculate_overlap_area_in_bbox1_area_ratio_matrix(span_bboxes, discarded_block_bboxes) > 0.4).any(axis=1)
+    in_image = (calculate_overlap_area_in_bbox1_area_ratio_matrix(span_bboxes, image_bboxes) > 0.5).any(axis=1)
+    in_table = (calculate_overlap_area_in_bbox1_area_ratio_matrix(span_bboxes, table_bboxes) > 0.5).any(axis=1)
+    in_other = (calculate_overlap_area_in_bbox1_area_ratio_matrix(span_bboxes, other_block_bboxes) > 0.5).any(axis=1)
+
     new_spans = []
 
-    for span in spans:
-        span_bbox = span['bbox']
+    for i, span in enumerate(spans):
         span_type = span['type']
 
-        if any(calculate_overlap_area_in_bbox1_area_ratio(span_bbox, block_bbox) > 0.4 for block_bbox in
-               discarded_block_bboxes):
+        if in_discarded[i]:
             new_spans.append(span)
             continue
 
         if span_type == ContentType.IMAGE:
-            if any(calculate_overlap_area_in_bbox1_area_ratio(span_bbox, block_bbox) > 0.5 for block_bbox in
-                   image_bboxes):
+            if in_image[i]:
                 new_spans.append(span)
         elif span_type == ContentType.TABLE:
-            if any(calculate_overlap_area_in_bbox1_area_ratio(span_bbox, block_bbox) > 0.5 for block_bbox in
-                   table_bboxes):
+            if in_table[i]:
                 new_spans.append(span)
         else:
-            if any(calculate_overlap_area_in_bbox1_area_ratio(span_bbox, block_bbox) > 0.5 for block_bbox in
-                   other_block_bboxes):
+            if in_other[i]:
                 new_spans.append(span)
 
     return new_spans
@@ -58,15 +60,17 @@ def remove_outside_spans(spans, all_bboxes, all_discarded_blocks):
 
 def remove_overlaps_low_confidence_spans(spans):
     dropped_spans = []
+    # 两两之间的iou一次性批量计算
+    overlap_matrix = calculate_iou_matrix([span['bbox'] for span in spans], [span['bbox'] for span in spans]) > 0.9
     #  删除重叠spans中置信度低的的那些
-    for span1 in spans:
-        for span2 in spans:
+    for i, span1 in enumerate(spans):
+        for j, span2 in enumerate(spans):
             if span1 != span2:
                 # span1 或 span2 任何一个都不应该在 dropped_spans 中
                 if span1 in dropped_spans or span2 in dropped_spans:
                     continue
                 else:
-                    if calculate_iou(span1['bbox'], span2['bbox']) > 0.9:
+                    if overlap_matrix[i, j]:
                         if span1['score'] < span2['score']:
                             span_need_remove = span1
                         else:
@@ -86,6 +90,10 @@ def remove_overlaps_low_confidence_spans(spans):
 
 def remove_overlaps_min_spans(spans):
     dropped_spans = []
+    # bbox到第一个具有该bbox的span的索引, 只建立一次, 避免每次命中都线性查找整个spans
+    first_span_by_bbox = {}
+    for span in spans:
+        first_span_by_bbox.setdefault(tuple(span['bbox']), span)
     #  删除重叠spans中较小的那些
     for span1 in spans:
         for span2 in spans:
@@ -96,7 +104,7 @@ def remove_overlaps_min_spans(spans):
                 else:
                     overlap_box = get_minbox_if_overlap_by_ratio(span1['bbox'], span2['bbox'], 0.65)
                     if overlap_box is not None:
-                        span_need_remove = next((span for span in spans if span['bbox'] == overlap_box), None)
+                        span_need_remove = first_span_by_bbox.get(tuple(overlap_box))
                         if span_need_remove is not None and span_need_remove not in dropped_spans:
                             dropped_spans.append(span_need_remove)
     if len(dropped_spans) > 0:
@@ -153,15 +161,20 @@ def txt_spans_extract(pdf_page, spans, pil_img, scale, all_bboxes, all_discarded
     unuseful_spans = []
     # 纵向span的两个特征：1. 高度超过多个line 2. 高宽比超过某个值
     vertical_spans = []
+    # 与span无关的量在整页范围内只计算一次: 可参与匹配的block(bbox, 是否属于all_bboxes)及纵向span的高度阈值
+    candidate_blocks = [
+        (block[0:4], block in all_bboxes)
+        for block in all_bboxes + all_discarded_blocks
+        if block[7] not in [BlockType.IMAGE_BODY, BlockType.TABLE_BODY, BlockType.INTERLINE_EQUATION]
+    ]
+    vertical_span_min_height = median_span_height * 3
     for span in spans:
         if span['type'] in [ContentType.TEXT]:
-            for block in all_bboxes + all_discarded_blocks:
-                if block[7] in [BlockType.IMAGE_BODY, BlockType.TABLE_BODY, BlockType.INTERLINE_EQUATION]:
-                    continue
-                if calculate_overlap_area_in_bbox1_area_ratio(span['bbox'], block[0:4]) > 0.5:
-                    if span['height'] > median_span_height * 3 and span['height'] > span['width'] * 3:
+            for block_bbox, is_useful_block in candidate_blocks:
+                if calculate_overlap_area_in_bbox1_area_ratio(span['bbox'], block_bbox) > 0.5:
+                    if span['height'] > vertical_span_min_height and span['height'] > span['width'] * 3:
                         vertical_spans.append(span)
-                    elif block in all_bboxes:
+                    elif is_useful_block:
                         useful_spans.append(span)
                     else:
                         unuseful_spans.append(span)
@@ -193,10 +206,11 @@ def txt_spans_extract(pdf_page, spans, pil_img, scale, all_bboxes, all_discarded
     """对未填充的span进行ocr"""
     if len(need_ocr_spans) > 0:
 
+        # 整页只转换一次ndarray, 各span直接在数组视图上截图, 不再逐个生成PIL图片
+        np_img = np.asarray(pil_img)
         for span in need_ocr_spans:
             # 对span的bbox截图再ocr
-            span_pil_img = get_crop_img(span['bbox'], pil_img, scale)
-            span_img = cv2.cvtColor(np.array(span_pil_img), cv2.COLOR_RGB2BGR)
+            span_img = cv2.cvtColor(get_crop_np_img(span['bbox'], np_img, scale), cv2.COLOR_RGB2BGR)
             # 计算span的对比度，低于0.20的span不进行ocr
             if calculate_contrast(span_img, img_mode='bgr') <= 0.17:
                 spans.remove(span)
@@ -10,6 +10,10 @@ from mineru.utils.enum_class import BlockType, SplitFlag
 CONTINUATION_MARKERS = ["(续)", "(续表)", "(continued)", "(cont.)"]
 
 
+# Full-width letters, numbers and punctuation (FF01-FF5E), shifted to ASCII range
+FULL_TO_HALF_TABLE = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+
+
 def full_to_half(text: str) -> str:
     """Convert full-width characters to half-width characters using code point manipulation.
 
@@ -19,15 +23,7 @@ def full_to_half(text: str) -> str:
     Returns:
         String with full-width characters converted to half-width
     """
-    result = []
-    for char in text:
-        code = ord(char)
-        # Full-width letters, numbers and punctuation (FF01-FF5E)
-        if 0xFF01 <= code <= 0xFF5E:
-            result.append(chr(code - 0xFEE0))  # Shift to ASCII range
-        else:
-            result.append(char)
-    return ''.join(result)
+    return text.translate(FULL_TO_HALF_TABLE)
 
 
 def calculate_table_total_columns(soup):
@@ -0,0 +1,53 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import random
+
+import numpy as np
+import pytest
+
+from mineru.utils.boxbase import (
+    calculate_iou,
+    calculate_iou_matrix,
+    calculate_overlap_area_in_bbox1_area_ratio,
+    calculate_overlap_area_in_bbox1_area_ratio_matrix,
+    is_in,
+    is_in_matrix,
+)
+
+
+def random_bboxes(rng, count):
+    """生成随机bbox, 使用较小的整数坐标以覆盖相交、包含、贴边与面积为0等情况."""
+    bboxes = []
+    for _ in range(count):
+        x0, y0 = rng.randint(0, 20), rng.randint(0, 20)
+        bboxes.append([x0, y0, x0 + rng.randint(0, 10), y0 + rng.randint(0, 10)])
+    return bboxes
+
+
+@pytest.mark.parametrize(
+    'matrix_func, scalar_func',
+    [
+        (calculate_iou_matrix, calculate_iou),
+        (calculate_overlap_area_in_bbox1_area_ratio_matrix, calculate_overlap_area_in_bbox1_area_ratio),
+        (is_in_matrix, is_in),
+    ],
+)
+def test_matrix_matches_scalar(matrix_func, scalar_func):
+    rng = random.Random(0)
+    for _ in range(20):
+        bboxes1 = random_bboxes(rng, rng.randint(1, 15))
+        bboxes2 = random_bboxes(rng, rng.randint(1, 15))
+        result = matrix_func(bboxes1, bboxes2)
+        expected = [[scalar_func(b1, b2) for b2 in bboxes2] for b1 in bboxes1]
+        assert result.shape == (len(bboxes1), len(bboxes2))
+        np.testing.assert_allclose(result, np.array(expected, dtype=result.dtype))
+
+
+@pytest.mark.parametrize(
+    'matrix_func',
+    [calculate_iou_matrix, calculate_overlap_area_in_bbox1_area_ratio_matrix, is_in_matrix],
+)
+def test_matrix_empty_inputs(matrix_func):
+    bboxes = [[0, 0, 10, 10], [5, 5, 15, 15]]
+    assert matrix_func([], bboxes).shape == (0, 2)
+    assert matrix_func(bboxes, []).shape == (2, 0)
+    assert matrix_func([], []).shape == (0, 0)